@@ -1,17 +1,34 @@
-from flask import Flask, request, render_template, jsonify, send_file
+from flask import Flask, g, request, render_template, jsonify, send_file
+from werkzeug.http import is_resource_modified
 import csv
-from io import BytesIO
+from io import BytesIO, StringIO
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import re
 import glob
+from collections import Counter
 import subprocess
 import sys
+import threading
+import time
 import importlib
+import json
+import functools
+import hashlib
+import html
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 import converter  # Import the converter module
+from reloader import BackgroundReloader, ProcessLock, UploadWatcher
+from timetable_index import TimetableIndex, day_time_key
+from snapshot import TimetableSnapshot
+from snapshot_file import read_snapshot_file, read_snapshot_header, write_snapshot_file
+from entries import DAY_ORDER, TimetableEntry
+from response_cache import ExportCache, ResponseCache, normalize_args
+from teachers_directory import TeachersDirectory
+from xlsx_export import XLSX_MIMETYPE, XlsxWorkbook, records_to_xlsx
 from cgpa_calculator import cgpa_bp  # Import the CGPA calculator blueprint
 from shadowtext_studio import shadowtext_bp  # Import the ShadowText Studio blueprint
-import pandas as pd
 
 app = Flask(__name__)
 
@@ -21,12 +38,12 @@ app.register_blueprint(cgpa_bp)
 # Register the ShadowText Studio blueprint
 app.register_blueprint(shadowtext_bp)
 
-timetable_info = "Fall 2025 - Version 1.10"  # Default fallback
+DEFAULT_TIMETABLE_INFO = "Fall 2025 - Version 1.10"  # Default fallback
 
 
 # Create required folder structure
 def create_folder_structure():
-    folders = ["uploads", "uploads/csv", "uploads/xlsx", "static"]
+    folders = ["uploads", "uploads/csv", "uploads/xlsx", "uploads/cache", "static"]
     for folder in folders:
         try:
             if not os.path.exists(folder):
@@ -41,20 +58,115 @@ try:
 except Exception as e:
     print(f"Warning: Could not initialize folder structure: {e}")
 
-# Store timetable data for each teacher
-timetable_data = {}
-teacher_names = set()
+# The published timetable: teacher entries, indexes, rendered cards and version
+# info. Requests read it once and use that snapshot throughout; ingest replaces
+# it with a single assignment
+current_snapshot = TimetableSnapshot(info=DEFAULT_TIMETABLE_INFO)
+
+TEACHERS_RECORD_FILE = "uploads/csv/teachers-record.csv"
+teachers_directory = None  # TeachersDirectory for the current record file, see get_teachers_directory
 
 # Valid prefixes in hierarchical order
-prefix_hierarchy = ["Ms", "Mrs", "Miss", "Ma'am", "Maam", "Mr", "Sir", "Dr", "Prof"]
+prefix_hierarchy = converter.PREFIX_HIERARCHY
 
 # Add file modification tracking
-last_modified = None
 current_csv_file = None
+converted_records = None  # (csv path, records) from the last in-process conversion
+last_conversion_report = None  # converter.ConversionReport.as_dict() of the last conversion, also shared via SNAPSHOT_FILE
+
+# Content-addressed conversion cache (see converter.workbook_cache_key)
+CONVERSION_CACHE_DIR = "uploads/cache"
+converted_workbook_key = None  # Key of the workbook the current CSV was converted from
+workbook_keys = {}  # xlsx path -> ((mtime, size), key)
+
+# With several worker processes, one of them (the holder of ingest_lock)
+# converts and ingests new timetables and writes the result to SNAPSHOT_FILE;
+# the others map that file instead of repeating the work (set
+# TIMETABLE_SHARED_SNAPSHOT=0 to have every process ingest for itself)
+SHARED_SNAPSHOT = os.environ.get("TIMETABLE_SHARED_SNAPSHOT", "1") != "0"
+
+# Serve the last written SNAPSHOT_FILE from import time on, so a restarted
+# worker (or a gunicorn master started with --preload) has data before its
+# first reload finishes (set TIMETABLE_WARM_START=0 to start empty)
+WARM_START = os.environ.get("TIMETABLE_WARM_START", "1") != "0"
+
+SNAPSHOT_FILE = os.path.join(CONVERSION_CACHE_DIR, "timetable.snapshot")
+
+# Bump when a change to ingest (records to teacher entries) changes the
+# timetable it builds. SNAPSHOT_FILEs written by another ingest or
+# converter version are neither warm-started from nor loaded
+INGEST_VERSION = "2"
+SNAPSHOT_VERSION = f"{INGEST_VERSION}:{converter.CONVERTER_VERSION}"
+ingest_lock = ProcessLock(os.path.join(CONVERSION_CACHE_DIR, "ingest.lock"))
+written_snapshot_key = None  # (fingerprint, source_mtime, info) last written to SNAPSHOT_FILE
+loaded_snapshot_stat = None  # (mtime_ns, size, inode) of the SNAPSHOT_FILE last loaded
+
+# Run xlsx conversions in a child process (set TIMETABLE_CONVERT_SUBPROCESS=0 to convert in-process)
+CONVERT_IN_SUBPROCESS = os.environ.get("TIMETABLE_CONVERT_SUBPROCESS", "1") != "0"
+
+# Workbook reader and worker processes of a conversion: with the stream
+# reader each worker parses its own sheets (0 = one per CPU). Only the
+# child process converts in parallel; forking worker processes from a
+# threaded web worker is not safe
+CONVERT_READER = os.environ.get("TIMETABLE_CONVERT_READER", "stream")
+CONVERT_WORKERS = int(os.environ.get("TIMETABLE_CONVERT_WORKERS", "0"))
+
+# Seconds a conversion child process may run before it is killed, so a
+# workbook that hangs the converter cannot block later reloads
+CONVERT_TIMEOUT = float(os.environ.get("TIMETABLE_CONVERT_TIMEOUT", "300"))
+
+# How long the very first request waits for the initial load before rendering
+INITIAL_LOAD_TIMEOUT = float(os.environ.get("TIMETABLE_INITIAL_LOAD_TIMEOUT", "60"))
+
+# Upload folder polling interval in seconds; inotify wakes the watcher sooner where available
+WATCH_INTERVAL = float(os.environ.get("TIMETABLE_WATCH_INTERVAL", "5"))
+WATCH_USE_INOTIFY = os.environ.get("TIMETABLE_WATCH_INOTIFY", "1") != "0"
+
+# Serialized JSON responses per (route, query args, data version); parameterised
+# queries share an LRU of this many entries
+RESPONSE_CACHE_SIZE = int(os.environ.get("TIMETABLE_RESPONSE_CACHE_SIZE", "512"))
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+# Responses computed on the reload worker right after new data is published
+PREWARMED_PATHS = ["/get_sections", "/get_rooms", "/timetable", "/cards"]
+
+# Teacher card HTML, rendered on first use per data version and served by /cards
+teacher_cards = (None, {})  # (data version, {teacher: card HTML})
+CARDS_PER_PAGE = 20
+MAX_CARDS_PER_PAGE = 100
+
+# Generated XLSX files per (route, query args, data fingerprint), up to this
+# many bytes in each worker
+EXPORT_CACHE_BYTES = int(os.environ.get("TIMETABLE_EXPORT_CACHE_BYTES", str(32 * 2**20)))
+export_cache = ExportCache(EXPORT_CACHE_BYTES)
+
+# The ingesting worker pre-builds the common exports after each reload, on
+# this many threads (0 disables it), and shares them with the other workers
+# as files in EXPORT_DIR
+EXPORT_PREWARM_WORKERS = int(os.environ.get("TIMETABLE_EXPORT_PREWARM_WORKERS", "2"))
+EXPORT_DIR = os.path.join(CONVERSION_CACHE_DIR, "exports")
+export_prewarm_pool = None  # (pid, ThreadPoolExecutor), created on first use
+prewarmed_export_version = None  # Data version the last prewarm ran for
+
+# Cache-Control max-age for data responses: new timetables are only picked up
+# every watch interval, so clients revalidate (cheaply, via ETag) about as often
+DATA_MAX_AGE = int(os.environ.get("TIMETABLE_DATA_MAX_AGE", str(int(WATCH_INTERVAL))))
+
+# Fingerprinted static URLs (?v=<content hash>) are cached for a year
+STATIC_MAX_AGE = 365 * 24 * 3600
+static_fingerprints = {}  # static filename -> ((mtime, size), fingerprint)
+
+# Newest uploads as last seen by the upload watcher
+latest_xlsx_file = None
+latest_csv_file = None
 
 
 def get_latest_xlsx_file():
     """Get the latest xlsx file from uploads/xlsx folder"""
+    # Once the upload watcher has scanned, it tracks the latest file for us
+    if upload_watcher.files is not None:
+        return latest_xlsx_file
+
     try:
         xlsx_files = glob.glob("uploads/xlsx/*.xlsx")
         if not xlsx_files:
@@ -66,9 +178,23 @@ def get_latest_xlsx_file():
         return None
 
 
-def convert_xlsx_to_csv():
+def get_workbook_key(xlsx_file):
+    """Get the conversion cache key of a workbook, re-hashing only when its mtime or size changes"""
+    stat = os.stat(xlsx_file)
+    signature = (stat.st_mtime, stat.st_size)
+    cached = workbook_keys.get(xlsx_file)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    key = converter.workbook_cache_key(xlsx_file)
+    workbook_keys[xlsx_file] = (signature, key)
+    return key
+
+
+def convert_xlsx_to_csv(latest_xlsx=None):
     """Convert latest xlsx file to csv using converter.py"""
-    latest_xlsx = get_latest_xlsx_file()
+    if latest_xlsx is None:
+        latest_xlsx = get_latest_xlsx_file()
     if not latest_xlsx:
         print("No xlsx files found in uploads/xlsx folder")
         return None
@@ -78,14 +204,74 @@ def convert_xlsx_to_csv():
         "uploads/csv/" + os.path.splitext(os.path.basename(latest_xlsx))[0] + ".csv"
     )
 
+    global converted_records, last_conversion_report
+
     try:
-        # Reload the converter module to ensure we get fresh code
-        importlib.reload(converter)
+        if CONVERT_IN_SUBPROCESS:
+            # Parse in a separate process so openpyxl's memory never lands in
+            # this worker; it fills the conversion cache, which we read back
+            report_file = os.path.join(
+                CONVERSION_CACHE_DIR, f"report-{os.getpid()}.json"
+            )
+            subprocess.run(
+                [
+                    sys.executable,
+                    converter.__file__,
+                    latest_xlsx,
+                    "--output",
+                    output_filename,
+                    "--cache-dir",
+                    CONVERSION_CACHE_DIR,
+                    "--reader",
+                    CONVERT_READER,
+                    "--workers",
+                    str(CONVERT_WORKERS),
+                    "--report",
+                    report_file,
+                ],
+                check=True,
+                timeout=CONVERT_TIMEOUT,
+            )
+            with open(report_file, "r", encoding="utf-8") as file:
+                last_conversion_report = json.load(file)
+            os.remove(report_file)
+
+            # The child reports the key it cached the rows under, so the
+            # workbook is not hashed again here
+            rows = None
+            if last_conversion_report.get("cache_key"):
+                rows = converter.load_cached_rows(
+                    CONVERSION_CACHE_DIR, last_conversion_report["cache_key"]
+                )
+            if rows is not None:
+                records = converter.rows_to_records(rows)
+            else:
+                records = converter.extract_timetable_records(
+                    latest_xlsx, cache_dir=CONVERSION_CACHE_DIR
+                )
+        else:
+            # Reload the converter module to ensure we get fresh code
+            importlib.reload(converter)
+
+            # Extract records for direct ingest, writing the CSV as a side output;
+            # identical workbooks are served from the conversion cache instead of re-parsed
+            report = converter.ConversionReport(latest_xlsx)
+            records = converter.extract_timetable_records(
+                latest_xlsx,
+                reader=CONVERT_READER,
+                cache_dir=CONVERSION_CACHE_DIR,
+                csv_output=output_filename,
+                report=report,
+            )
+            print(report.summary())
+            last_conversion_report = report.as_dict()
 
-        # Call the converter with our input and output paths
-        converter.convert_xlsx_to_csv(latest_xlsx, output_filename)
+        converted_records = (output_filename, records)
 
         return output_filename
+    except subprocess.TimeoutExpired:
+        print(f"Error converting xlsx to csv: {latest_xlsx} took over {CONVERT_TIMEOUT:g}s, conversion stopped")
+        return None
     except Exception as e:
         print(f"Error converting xlsx to csv: {e}")
         import traceback
@@ -96,7 +282,7 @@ def convert_xlsx_to_csv():
 
 def get_current_csv_file():
     """Get the current CSV file to use"""
-    global current_csv_file
+    global current_csv_file, converted_workbook_key
 
     # Check if we need to convert xlsx to csv
     try:
@@ -108,14 +294,17 @@ def get_current_csv_file():
                 + ".csv"
             )
 
-            # Convert if CSV doesn't exist or xlsx is newer
-            if not os.path.exists(expected_csv) or os.path.getmtime(
-                latest_xlsx
-            ) > os.path.getmtime(expected_csv):
+            # Convert if CSV doesn't exist or wasn't converted from this workbook's content
+            workbook_key = get_workbook_key(latest_xlsx)
+            if (
+                not os.path.exists(expected_csv)
+                or workbook_key != converted_workbook_key
+            ):
                 print("Converting latest xlsx to csv...")
-                converted_csv = convert_xlsx_to_csv()
+                converted_csv = convert_xlsx_to_csv(latest_xlsx)
                 if converted_csv:
                     current_csv_file = converted_csv
+                    converted_workbook_key = workbook_key
             else:
                 current_csv_file = expected_csv
     except Exception as e:
@@ -123,6 +312,10 @@ def get_current_csv_file():
 
     # Fallback to any existing CSV in csv folder
     if not current_csv_file or not os.path.exists(current_csv_file):
+        if upload_watcher.files is not None:
+            current_csv_file = latest_csv_file
+            return current_csv_file
+
         try:
             csv_files = glob.glob("uploads/csv/*.csv")
             if csv_files:
@@ -250,234 +443,668 @@ def generate_teacher_image_path(teacher_name):
     return "/static/faculty/profile.png"
 
 
-def export_to_xlsx(data, filename):
-    """Export data to XLSX and return as response"""
-    if data and len(data) > 0:
-        if isinstance(data[0], dict):
-            df = pd.DataFrame(data)
+def xlsx_bytes(data, filename):
+    """Serialize data (a list of dicts, or of plain values) to XLSX bytes"""
+    if data and not isinstance(data[0], dict):
+        # For simple lists
+        if filename.startswith("sections"):
+            column = "Section"
+        elif filename.startswith("rooms"):
+            column = "Room"
         else:
-            # For simple lists
-            if filename.startswith("sections"):
-                df = pd.DataFrame({"Section": data})
-            elif filename.startswith("rooms"):
-                df = pd.DataFrame({"Room": data})
+            column = "Data"
+        data = [{column: value} for value in data]
+    return records_to_xlsx(data or [], "Data")
+
+
+def xlsx_response(body, filename):
+    """Return XLSX bytes as a download"""
+    return send_file(
+        BytesIO(body),
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=filename,
+    )
+
+
+def cached_export(filename, build, version):
+    """
+    XLSX download of the bytes build() returns, cached in export_cache per
+    route, query args and version (that of the data build reads). On a
+    miss the copy shared in EXPORT_DIR is used when there is one; exports
+    built by prewarm_exports are shared there.
+    """
+    params = normalize_args(request.args) + tuple(sorted(request.view_args.items()))
+    key = (request.path, params, version)
+    body = export_cache.get_or_build(key, lambda: read_shared_export(key) or build())
+    if g.get("shared_exports") is not None:
+        share_export(key, body)
+    return xlsx_response(body, filename)
+
+
+def shared_export_path(key):
+    """File in EXPORT_DIR for the export cached under key"""
+    name = hashlib.sha256(repr((SNAPSHOT_VERSION, key)).encode()).hexdigest()[:32]
+    return os.path.join(EXPORT_DIR, f"{name}.xlsx")
+
+
+def read_shared_export(key):
+    """Bytes of the shared export file for key, or None"""
+    try:
+        with open(shared_export_path(key), "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def share_export(key, body):
+    """Write body to the shared export file for key, if it is not there yet"""
+    path = shared_export_path(key)
+    g.shared_exports.add(path)
+    if os.path.exists(path):
+        return
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(body)
+    os.replace(temp_path, path)
+
+
+def static_fingerprint(filename):
+    """Short content hash of a static file, recomputed only when the file changes"""
+    path = os.path.join(app.static_folder, filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = static_fingerprints.get(filename)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(path, "rb") as file:
+        fingerprint = hashlib.sha256(file.read()).hexdigest()[:12]
+    static_fingerprints[filename] = (signature, fingerprint)
+    return fingerprint
+
+
+def fingerprint_static_url(url):
+    """Append the content fingerprint to a /static/ URL"""
+    if url and url.startswith("/static/") and "?" not in url:
+        fingerprint = static_fingerprint(url[len("/static/") :])
+        if fingerprint:
+            return f"{url}?v={fingerprint}"
+    return url
+
+
+@app.url_defaults
+def add_static_fingerprint(endpoint, values):
+    """Fingerprint url_for('static', ...) URLs so they can be cached long-term"""
+    if endpoint == "static" and "filename" in values and "v" not in values:
+        fingerprint = static_fingerprint(values["filename"])
+        if fingerprint:
+            values["v"] = fingerprint
+
+
+@app.after_request
+def cache_fingerprinted_static(response):
+    """A fingerprinted URL always names the same content, so let clients keep it"""
+    if request.endpoint == "static" and request.args.get("v") and response.status_code in (200, 304):
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+
+def teachers_directory_version(snapshot):
+    """Version of /get_teachers: the record file (rewritten when a teacher's row changes) and the faculty images"""
+    parts = []
+    for path in (TEACHERS_RECORD_FILE, os.path.join(app.static_folder, "faculty")):
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            parts.append("-")
+    return ":".join(parts)
+
+
+def get_teachers_directory():
+    """The teachers directory for the current teachers-record.csv, reloaded when it changes"""
+    global teachers_directory
+
+    version = teachers_directory_version(current_snapshot)
+    directory = teachers_directory
+    if directory is None or directory.version != version:
+        directory = TeachersDirectory.load(TEACHERS_RECORD_FILE, version)
+        teachers_directory = directory
+    return directory
+
+
+def teachers_directory_modified(snapshot):
+    """Last-Modified of /get_teachers: the latest of the data's publish time, the record file and the faculty images"""
+    times = [snapshot.modified] if snapshot.modified else []
+    for path in (TEACHERS_RECORD_FILE, os.path.join(app.static_folder, "faculty")):
+        try:
+            times.append(datetime.fromtimestamp(int(os.stat(path).st_mtime), timezone.utc))
+        except OSError:
+            pass
+    return max(times, default=None)
+
+
+def conditional_response(version=lambda snapshot: snapshot.fingerprint, modified=lambda snapshot: snapshot.modified):
+    """
+    Send a strong ETag, Last-Modified and Cache-Control with a data view's
+    responses and answer matching conditional requests with 304 without
+    running the view. The ETag is derived from version(snapshot), the
+    route and the query args; Last-Modified is modified(snapshot), which
+    must change whenever the version does.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            snapshot = current_snapshot
+            params = normalize_args(request.args) + tuple(sorted(kwargs.items()))
+            etag = hashlib.sha256(repr((version(snapshot), request.path, params)).encode()).hexdigest()[:32]
+            last_modified = modified(snapshot)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = app.response_class(status=304)
             else:
-                df = pd.DataFrame({"Data": data})
-
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="Data", index=False)
-        output.seek(0)
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=filename,
-        )
-    else:
-        # Return empty file
-        output = BytesIO()
-        df = pd.DataFrame()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="Data", index=False)
-        output.seek(0)
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=filename,
-        )
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = None  # send_file marks downloads no-cache
+            response.cache_control.public = True
+            response.cache_control.max_age = DATA_MAX_AGE
+            response.cache_control.must_revalidate = True
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cached_response(view):
+    """Serve a JSON view from response_cache; XLSX exports and errors are not cached"""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.path.endswith("/xlsx"):
+            return view(*args, **kwargs)
+
+        params = normalize_args(request.args) + tuple(sorted(kwargs.items()))
+        key = (request.path, params, current_snapshot.version)
+        body = response_cache.get(key)
+        if body is not None:
+            return app.response_class(body, mimetype="application/json")
+
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response_cache.put(key, response.get_data())
+        return response
+
+    return wrapper
+
+
+def response_unchanged(path, params, previous, snapshot):
+    """Whether the response or export cached for path and params is the same in snapshot as in previous, going by snapshot.changes"""
+    changes = snapshot.changes
+    args = {}
+    for name, value in params:
+        args.setdefault(name, value)  # Views read the first value
+
+    if path == "/department/xlsx":
+        # Has a sheet per section, teacher or room
+        return not changes["teachers"]
+    # Exports hold the same data as the JSON views they are under
+    path = path.removesuffix("/xlsx").removesuffix("/download")
+
+    if path == "/get_sections":
+        return snapshot.index.sections.names == previous.index.sections.names
+    if path == "/get_rooms":
+        return snapshot.index.rooms.names == previous.index.rooms.names
+    if path.startswith("/section/"):
+        semester = str(args.get("semester"))
+        return not any(semester in section for section in changes["sections"])
+    if path == "/timetable":
+        name = args.get("name", "").upper()
+        timetable_type = args.get("type", "teacher")
+        if not name:
+            return not changes["teachers"]
+        if timetable_type == "teacher":
+            return name not in changes["teachers"]
+        touched = changes["rooms"] if timetable_type == "room" else changes["sections"]
+        return not any(name.lower() in touched_name.lower() for touched_name in touched)
+    return False
+
+
+def carry_over_caches(previous, snapshot):
+    """
+    Move the cached responses, exports and teacher cards that snapshot's
+    changes leave as they were from previous's version to snapshot's and
+    drop the rest; all are dropped when the changes are not relative to
+    previous.
+    """
+    global teacher_cards
+
+    changes = snapshot.changes
+    if not changes or changes["since"] != previous.fingerprint:
+        response_cache.clear()
+        export_cache.clear()
+        teacher_cards = (None, {})
+        return
+
+    def keep(path, params):
+        return response_unchanged(path, params, previous, snapshot)
+
+    response_cache.carry_over(previous.version, snapshot.version, keep)
+    # Exports are keyed by fingerprint, which is the same in every worker
+    if snapshot.fingerprint != previous.fingerprint:
+        export_cache.carry_over(previous.fingerprint, snapshot.fingerprint, keep)
+    version, cards = teacher_cards
+    if version == previous.version:
+        cards = {teacher: card for teacher, card in cards.items() if teacher not in changes["teachers"]}
+        teacher_cards = (snapshot.version, cards)
+
+
+def prewarm_response_cache():
+    """Compute the common parameterless responses for the current data version"""
+    for path in PREWARMED_PATHS:
+        with app.test_request_context(path):
+            # Straight to the view: the before_request hooks would start the
+            # background workers, e.g. in a preloading gunicorn master
+            app.dispatch_request()
+
+
+def export_prewarm_paths(snapshot):
+    """Download URLs most requested after a new timetable: the full lists and workbook, every semester and section"""
+    sections = snapshot.index.sections.names
+    semesters = sorted({int(number) for section in sections for number in re.findall(r"\d+", section)})
+    return (
+        ["/timetable/xlsx", "/get_sections/xlsx", "/get_rooms/xlsx", "/get_teachers/xlsx", "/department/xlsx"]
+        + [f"/section/{semester}/download" for semester in semesters]
+        + ["/timetable/xlsx?" + urlencode({"type": "section", "name": section}) for section in sections]
+    )
+
+
+def build_export(path, version, shared):
+    """
+    Fill export_cache with the download at path and share it in EXPORT_DIR,
+    adding its file to shared, unless the data moved past version
+    """
+    if current_snapshot.version != version:
+        return
+    try:
+        with app.test_request_context(path):
+            g.shared_exports = shared
+            app.dispatch_request()
+    except Exception as e:
+        print(f"Error prebuilding export {path}: {e}")
+
+
+def prewarm_exports():
+    """
+    Build the common exports of the current data and share them in
+    EXPORT_DIR, removing the files of earlier data. Runs on the ingesting
+    worker's reload thread; exports carried over from the previous data
+    are only written out, not rebuilt.
+    """
+    global export_prewarm_pool, prewarmed_export_version
+
+    snapshot = current_snapshot
+    if not EXPORT_PREWARM_WORKERS or not snapshot.timetable_data or snapshot.version == prewarmed_export_version:
+        return
+    prewarmed_export_version = snapshot.version
+
+    # Threads do not survive fork, so the pool is created in the worker
+    if export_prewarm_pool is None or export_prewarm_pool[0] != os.getpid():
+        executor = ThreadPoolExecutor(EXPORT_PREWARM_WORKERS, thread_name_prefix="export-prewarm")
+        export_prewarm_pool = (os.getpid(), executor)
+    shared = set()
+    paths = export_prewarm_paths(snapshot)
+    list(export_prewarm_pool[1].map(lambda path: build_export(path, snapshot.version, shared), paths))
+
+    try:
+        names = os.listdir(EXPORT_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(EXPORT_DIR, name)
+        if path not in shared and not name.endswith(".tmp"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
 
 @app.route("/timetable")
 @app.route("/timetable/xlsx")
+@conditional_response()
+@cached_response
 def get_timetable():
     name = request.args.get("name", "").upper()
     timetable_type = request.args.get(
         "type", "teacher"
     )  # 'teacher', 'section', or 'room'
 
-    if name:
-        if timetable_type == "teacher":
-            data = timetable_data.get(name, [])
-        elif timetable_type == "room":  # room timetable
-            data = []
-            for entries in timetable_data.values():
-                for entry in entries:
-                    location = entry.get("location", "").strip()
-                    if location and name.lower() in location.lower():
-                        data.append(entry)
-        else:  # section timetable
-            data = []
-            for entries in timetable_data.values():
-                for entry in entries:
-                    groups = entry["groups"]
-                    if groups:
-                        # groups is now a list, not a string
-                        if isinstance(groups, list):
-                            # Check if name matches any group in the list
-                            if any(name.lower() in group.lower() for group in groups):
-                                data.append(entry)
-                        else:
-                            # Fallback for string format
-                            if name.lower() in groups.lower():
-                                data.append(entry)
+    day = request.args.get("day", "").strip().capitalize()
+    snapshot = current_snapshot
+
+    if name and timetable_type == "room":
+        # Index lookups return distinct entries already sorted by day and time
+        sorted_data = snapshot.index.find_rooms(name, day)
+    elif name and timetable_type != "teacher":  # section timetable
+        sorted_data = snapshot.index.find_sections(name, day)
+    elif timetable_type != "teacher":
+        # Every room or section: each class once, not once per co-teacher
+        sorted_data = snapshot.index.find_day(day) if day else snapshot.index.entries
     else:
-        # Return data for all teachers
-        data = [entry for entries in timetable_data.values() for entry in entries]
+        if name:
+            data = snapshot.timetable_data.get(name, ())
+        else:
+            # Return data for all teachers
+            data = [entry for entries in snapshot.timetable_data.values() for entry in entries]
 
-    # Sort the data by day and time before returning
-    sorted_data = sort_entries_by_day_and_time(data)
+        if day:
+            data = [entry for entry in data if entry.day == day]
+
+        # Sort the data by day and time before returning
+        sorted_data = sort_entries_by_day_and_time(data)
 
     # Check if XLSX export is requested
     if request.path.endswith("/xlsx"):
         filename = f"timetable_{timetable_type}_{name if name else 'all'}.xlsx"
-        return export_to_xlsx(sorted_data, filename)
+        return cached_export(
+            filename,
+            lambda: xlsx_bytes([entry.as_dict() for entry in sorted_data], filename),
+            snapshot.fingerprint,
+        )
 
-    return jsonify(sorted_data)
+    return jsonify([entry.as_dict() for entry in sorted_data])
 
 
 @app.route("/get_sections")
 @app.route("/get_sections/xlsx")
+@conditional_response()
+@cached_response
 def get_sections():
     """Get all unique sections from the timetable data"""
-    sections = set()
-    for entries in timetable_data.values():
-        for entry in entries:
-            groups = entry["groups"]
-            if groups:
-                # groups is now a list, not a string
-                if isinstance(groups, list):
-                    sections.update(groups)
-                else:
-                    # Fallback for string format
-                    group_parts = [g.strip() for g in groups.split("/")]
-                    sections.update(group_parts)
-
-    sections_list = sorted(list(sections))
+    snapshot = current_snapshot
+    sections_list = snapshot.index.sections.names
 
     # Check if XLSX export is requested
     if request.path.endswith("/xlsx"):
         data = [{"Section": section} for section in sections_list]
         filename = "sections.xlsx"
-        return export_to_xlsx(data, filename)
+        return cached_export(filename, lambda: xlsx_bytes(data, filename), snapshot.fingerprint)
 
     return jsonify(sections_list)
 
 
 @app.route("/get_rooms")
 @app.route("/get_rooms/xlsx")
+@conditional_response()
+@cached_response
 def get_rooms():
     """Get all unique rooms/labs from the timetable data"""
-    rooms = set()
-    for entries in timetable_data.values():
-        for entry in entries:
-            location = entry.get("location", "").strip()
-            if location:
-                rooms.add(location)
-
-    rooms_list = sorted(list(rooms))
+    snapshot = current_snapshot
+    rooms_list = snapshot.index.rooms.names
 
     # Check if XLSX export is requested
     if request.path.endswith("/xlsx"):
         data = [{"Room": room} for room in rooms_list]
         filename = "rooms.xlsx"
-        return export_to_xlsx(data, filename)
+        return cached_export(filename, lambda: xlsx_bytes(data, filename), snapshot.fingerprint)
 
     return jsonify(rooms_list)
 
 
+@app.route("/conversion_report")
+def get_conversion_report():
+    """Get the timing and counters report of the last xlsx conversion"""
+    if last_conversion_report is None:
+        return jsonify({"error": "No conversion has run yet"}), 404
+    return jsonify(last_conversion_report)
+
+
 @app.route("/get_teachers")
 @app.route("/get_teachers/xlsx")
+@conditional_response(teachers_directory_version, teachers_directory_modified)
 def get_teachers():
     """Get all teachers with their records"""
-    teachers_record_file = "uploads/csv/teachers-record.csv"
-    teachers_data = []
-
-    if os.path.exists(teachers_record_file):
-        with open(teachers_record_file, "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                teachers_data.append(
-                    {
-                        "name": row.get("Teacher name", ""),
-                        "subjects": row.get("Subjects/Courses", ""),
-                        "sections": row.get("Sections", ""),
-                        "office_number": row.get("Office Number", ""),
-                        "superior_email": row.get("Superior email", ""),
-                        "image": row.get("Teacher's Image", ""),
-                        "designation": row.get("Teacher's Designation", ""),
-                        "employee_code": row.get("Teacher's Employee code", ""),
-                    }
-                )
-
-    # Apply search filter
-    search = request.args.get("search", "").strip().lower()
-    if search:
-        teachers_data = [
-            teacher
-            for teacher in teachers_data
-            if search in teacher["name"].lower()
-            or search in teacher["subjects"].lower()
-            or search in teacher["sections"].lower()
-            or search in teacher["designation"].lower()
-            or search in teacher["employee_code"].lower()
-            or search in teacher["office_number"].lower()
-        ]
+    directory = get_teachers_directory()
 
-    # Apply subject filter
+    search = request.args.get("search", "").strip()
     subject_filter = request.args.get("subject", "").strip()
-    if subject_filter:
-        teachers_data = [
-            teacher
-            for teacher in teachers_data
-            if subject_filter in teacher["subjects"]
-        ]
-
-    # Apply section filter
     section_filter = request.args.get("section", "").strip()
-    if section_filter:
-        teachers_data = [
-            teacher
-            for teacher in teachers_data
-            if section_filter in teacher["sections"]
-        ]
-
-    # Apply sorting
     sort_by = request.args.get("sort", "name")
-    if sort_by == "name":
-        teachers_data.sort(key=lambda x: x["name"].lower())
-    elif sort_by == "designation":
-        teachers_data.sort(key=lambda x: (x["designation"] or "").lower())
-    elif sort_by == "subjects":
-        teachers_data.sort(key=lambda x: x["subjects"].lower())
-    elif sort_by == "sections":
-        teachers_data.sort(key=lambda x: x["sections"].lower())
-    elif sort_by == "employee_code":
-        teachers_data.sort(key=lambda x: x["employee_code"] or "")
-    elif sort_by == "office_number":
-        teachers_data.sort(key=lambda x: x["office_number"] or "")
+
+    def query():
+        return directory.query(search, subject_filter, section_filter, sort_by)
 
     # Check if XLSX export is requested
     if request.path.endswith("/xlsx"):
         filename = "teachers-record.xlsx"
-        return export_to_xlsx(teachers_data, filename)
+        return cached_export(filename, lambda: xlsx_bytes(query(), filename), directory.version)
+
+    def serialize():
+        teachers_data = query()
+        for teacher in teachers_data:
+            teacher["image"] = fingerprint_static_url(teacher["image"])
+        return jsonify(teachers_data).get_data()
+
+    key = ("json", search.lower(), subject_filter, section_filter, sort_by)
+    body = directory.cached(key, serialize)
+    return app.response_class(body, mimetype="application/json")
+
+
+def refresh_timetable():
+    """Convert and ingest the latest timetable if it changed; runs on the reload worker"""
+    global current_snapshot
+
+    if SHARED_SNAPSHOT and not ingest_lock.acquire():
+        # Another worker ingests; pick up what it published, giving it time
+        # for the first timetable when this worker has none yet
+        deadline = time.monotonic() + INITIAL_LOAD_TIMEOUT
+        while not current_snapshot.timetable_data and not read_current_snapshot_header():
+            if time.monotonic() > deadline or ingest_lock.acquire():
+                break
+            time.sleep(0.5)
+        if not ingest_lock.acquire():
+            load_shared_snapshot()
+            return
+
+    # Get current CSV file (will convert if needed)
+    csv_file = get_current_csv_file()
+    if not csv_file or not os.path.exists(csv_file):
+        return
+
+    # Extract timetable info from the xlsx filename (not csv)
+    info = current_snapshot.info
+    latest_xlsx = get_latest_xlsx_file()
+    try:
+        if latest_xlsx:
+            info = extract_timetable_info(latest_xlsx)
+    except Exception as e:
+        print(f"Error extracting timetable info: {e}")
 
-    return jsonify(teachers_data)
+    # Check if file has been modified
+    current_modified = os.path.getmtime(csv_file)
+    if current_snapshot.source_mtime != current_modified:
+        source = {
+            "source_file": csv_file,
+            "source_mtime": current_modified,
+            "info": info,
+        }
+
+        # Ingest the freshly converted records directly when we have them
+        if converted_records and converted_records[0] == csv_file:
+            process_records(converted_records[1], **source)
+        else:
+            process_file(csv_file, **source)
+        prewarm_response_cache()
+    elif info != current_snapshot.info:
+        current_snapshot = current_snapshot.replace(info=info)
+
+    if SHARED_SNAPSHOT or WARM_START:
+        write_shared_snapshot()
+    # After publishing, so the other workers do not wait for the exports;
+    # until they are shared a worker builds the ones it is asked for
+    prewarm_exports()
+
+
+def write_shared_snapshot():
+    """Write the current snapshot to SNAPSHOT_FILE for the other workers and restarts, if it changed"""
+    global written_snapshot_key
+
+    snapshot = current_snapshot
+    key = (snapshot.fingerprint, snapshot.source_mtime, snapshot.info)
+    if not snapshot.timetable_data or (key == written_snapshot_key and os.path.exists(SNAPSHOT_FILE)):
+        return
+    write_snapshot_file(
+        SNAPSHOT_FILE,
+        snapshot,
+        ingest_version=SNAPSHOT_VERSION,
+        workbook_key=converted_workbook_key,
+        conversion_report=last_conversion_report,
+    )
+    written_snapshot_key = key
 
 
-@app.route("/")
-def index():
-    global last_modified, timetable_info
+def read_current_snapshot_header():
+    """The header of SNAPSHOT_FILE if it was written by this SNAPSHOT_VERSION, else None"""
+    try:
+        header = read_snapshot_header(SNAPSHOT_FILE)
+    except (OSError, ValueError):
+        return None
+    return header if header.get("ingest_version") == SNAPSHOT_VERSION else None
+
+
+def load_shared_snapshot():
+    """Publish the snapshot in SNAPSHOT_FILE if it is new to this worker"""
+    global current_snapshot, loaded_snapshot_stat, last_conversion_report
 
-    # Get current CSV file (will convert if needed)
     try:
-        csv_file = get_current_csv_file()
+        stat = os.stat(SNAPSHOT_FILE)
+    except FileNotFoundError:
+        return
+    file_stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    if file_stat == loaded_snapshot_stat:
+        return
+
+    previous = current_snapshot
+    header = read_current_snapshot_header()
+    if header is None:
+        # Left by an older version; the ingesting worker replaces it
+        return
+    if header.get("conversion_report") is not None:
+        # The conversion ran in the ingesting worker
+        last_conversion_report = header["conversion_report"]
+    if header["fingerprint"] == previous.fingerprint:
+        # Same timetable, at most a new title
+        if header["info"] != previous.info:
+            current_snapshot = previous.replace(info=header["info"])
+        loaded_snapshot_stat = file_stat
+        return
+
+    header, timetable_data = read_snapshot_file(SNAPSHOT_FILE)
+    sorted_teachers = sort_teachers_by_prefix_and_name(timetable_data)
+    current_snapshot = TimetableSnapshot(
+        version=previous.version + 1,
+        fingerprint=header["fingerprint"],
+        timetable_data=timetable_data,
+        sorted_teachers=sorted_teachers,
+        source_file=header["source_file"],
+        source_mtime=header["source_mtime"],
+        modified=header["modified"],
+        info=header["info"],
+        changes=header.get("changes"),
+    )
+    carry_over_caches(previous, current_snapshot)
+    loaded_snapshot_stat = file_stat
+    print(f"Loaded shared timetable snapshot ({len(timetable_data)} teachers)")
+    prewarm_response_cache()
+
+
+def warm_start():
+    """Publish the persisted SNAPSHOT_FILE, if any, before the first reload"""
+    global current_csv_file, converted_workbook_key
+
+    try:
+        load_shared_snapshot()
+        header = read_current_snapshot_header() if loaded_snapshot_stat else None
     except Exception as e:
-        print(f"Error getting CSV file: {e}")
-        csv_file = None
+        print(f"Warning: Could not load {SNAPSHOT_FILE}: {e}")
+        return
 
-    if not csv_file or not os.path.exists(csv_file):
+    if not loaded_snapshot_stat and os.path.exists(SNAPSHOT_FILE):
+        print(f"Not warm-starting from {SNAPSHOT_FILE}: written by another ingest or converter version")
+    if header:
+        # The first reload then only converts and ingests if the uploads changed since
+        current_csv_file = header["source_file"]
+        converted_workbook_key = header.get("workbook_key")
+
+
+# Conversion and ingest run here, so requests keep serving the current data
+timetable_reloader = BackgroundReloader(refresh_timetable)
+
+
+def on_uploads_changed(files):
+    """Track the newest workbook and CSV from an upload watcher scan and schedule a reload"""
+    global latest_xlsx_file, latest_csv_file
+
+    xlsx_files = [path for path in files if path.endswith(".xlsx")]
+    csv_files = [path for path in files if path.endswith(".csv")]
+    latest_xlsx_file = max(xlsx_files, key=lambda path: files[path][0], default=None)
+    latest_csv_file = max(csv_files, key=lambda path: files[path][0], default=None)
+
+    timetable_reloader.request_reload()
+
+
+# Watches the upload folders so requests never scan the filesystem themselves
+upload_watcher = UploadWatcher(
+    {"uploads/xlsx": ".xlsx", "uploads/csv": ".csv", CONVERSION_CACHE_DIR: ".snapshot"},
+    on_uploads_changed,
+    interval=WATCH_INTERVAL,
+    use_inotify=WATCH_USE_INOTIFY,
+    ignore={"teachers-record.csv"},  # Written by every reload, never a timetable
+)
+
+
+@app.before_request
+def start_background_workers():
+    """Start watching uploads on this worker's first request, whatever the route"""
+    if request.endpoint == "static":
+        return
+
+    # New timetables are picked up by the upload watcher in the background;
+    # only requests before the first load wait, and only if no persisted
+    # snapshot was loaded at startup
+    upload_watcher.start()
+    if not timetable_reloader.loaded and not current_snapshot.timetable_data:
+        timetable_reloader.wait_until_loaded(INITIAL_LOAD_TIMEOUT)
+
+
+@app.route("/")
+def index():
+    snapshot = current_snapshot
+    timetable_info = snapshot.info or DEFAULT_TIMETABLE_INFO
+    csv_file = snapshot.source_file
+    if not snapshot.timetable_data and timetable_reloader.last_error:
+        return render_template(
+            "index.html",
+            table_html=f"<p>Error processing timetable file: {timetable_reloader.last_error}</p>",
+            teacher_names=[],
+            semester_info="Error",
+            timetable_info=timetable_info,
+        )
+
+    if not csv_file or snapshot.source_mtime is None:
         return render_template(
             "index.html",
             table_html="<p>No timetable files found. Please upload an xlsx file to uploads/xlsx folder.</p>",
@@ -486,27 +1113,6 @@ def index():
             timetable_info=timetable_info,
         )
 
-    # Check if file has been modified
-    try:
-        current_modified = os.path.getmtime(csv_file)
-    except Exception as e:
-        print(f"Error getting file modified time: {e}")
-        current_modified = None
-
-    if last_modified != current_modified:
-        try:
-            process_file(csv_file)
-            last_modified = current_modified
-        except Exception as e:
-            print(f"Error processing file: {e}")
-            return render_template(
-                "index.html",
-                table_html=f"<p>Error processing timetable file: {str(e)}</p>",
-                teacher_names=[],
-                semester_info="Error",
-                timetable_info=timetable_info,
-            )
-
     # Extract semester info from filename
     try:
         semester_info = extract_semester_info(csv_file)
@@ -514,112 +1120,29 @@ def index():
         print(f"Error extracting semester info: {e}")
         semester_info = "Unknown"
 
-    # Extract timetable info from the xlsx filename (not csv)
-    try:
-        latest_xlsx = get_latest_xlsx_file()
-        if latest_xlsx:
-            timetable_info = extract_timetable_info(latest_xlsx)
-    except Exception as e:
-        print(f"Error extracting timetable info: {e}")
-
-    try:
-        table_html = generate_cards_html()
-        sorted_teachers = sort_teachers_by_prefix_and_name(teacher_names)
-    except Exception as e:
-        print(f"Error generating cards: {e}")
-        table_html = ""
-        sorted_teachers = []
-
     # Format last modified date
     try:
         last_updated = (
-            datetime.fromtimestamp(last_modified).strftime("%b %d, %Y")
-            if last_modified
+            datetime.fromtimestamp(snapshot.source_mtime).strftime("%b %d, %Y")
+            if snapshot.source_mtime
             else "N/A"
         )
     except Exception as e:
         print(f"Error formatting date: {e}")
         last_updated = "N/A"
 
+    # Teacher cards are not part of the page; they load from /cards on demand
     return render_template(
         "index.html",
-        table_html=table_html,
-        teacher_names=sorted_teachers,
+        teacher_names=list(snapshot.sorted_teachers),
         semester_info=semester_info,
         timetable_info=timetable_info,
         last_updated=last_updated,
     )
 
 
-def parse_multiple_teachers(teachers_str):
-    """Parse multiple teachers from a string like 'Mr. John Mr. Jane Dr. Smith'"""
-    teachers_str = teachers_str.strip()
-    if not teachers_str:
-        return []
-
-    teachers = []
-    current_teacher = ""
-    words = teachers_str.split()
-
-    for word in words:
-        # Check if this word is a prefix (start of new teacher name)
-        if any(word.upper().startswith(prefix.upper()) for prefix in prefix_hierarchy):
-            # If we have a current teacher, add it to the list
-            if current_teacher.strip():
-                teachers.append(current_teacher.strip().upper())
-            # Start new teacher name
-            current_teacher = word
-        else:
-            # Continue building current teacher name
-            current_teacher += " " + word
-
-    # Add the last teacher
-    if current_teacher.strip():
-        teachers.append(current_teacher.strip().upper())
-
-    return teachers
-
-
-def parse_groups(group_string):
-    """Parse group string and return list of individual groups"""
-    if not group_string or group_string.strip() == "":
-        return []
-
-    # Clean the string
-    group_string = group_string.strip()
-
-    # Split by & and clean each part
-    parts = [part.strip() for part in group_string.split("&")]
-    groups = []
-    current_prefix = ""
-
-    for part in parts:
-        # If part contains a dash, it's a full group name
-        if "-" in part:
-            groups.append(part)
-            # Extract prefix for next iterations (e.g., "BSSE" from "BSSE-5A")
-            current_prefix = part.split("-")[0]
-        else:
-            # It's just a number/suffix, use the current prefix
-            if current_prefix and part:
-                groups.append(f"{current_prefix}-{part}")
-            elif part:
-                # If no current prefix, this might be a standalone group
-                groups.append(part)
-
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_groups = []
-    for group in groups:
-        if group and group not in seen:
-            seen.add(group)
-            unique_groups.append(group)
-
-    return unique_groups
-
-
-def create_teachers_record_csv():
-    """Create teachers-record.csv with teacher information from timetable data"""
+def create_teachers_record_csv(timetable_data):
+    """Create teachers-record.csv with teacher information from timetable data; an unchanged file is not rewritten"""
     teachers_record = {}
 
     # Collect data for each teacher
@@ -639,17 +1162,13 @@ def create_teachers_record_csv():
 
         for entry in entries:
             # Add subjects (unique)
-            teachers_record[teacher]["subjects"].add(entry["subject"])
+            teachers_record[teacher]["subjects"].add(entry.subject)
 
             # Add sections (unique)
-            if entry["groups"]:
-                if isinstance(entry["groups"], list):
-                    teachers_record[teacher]["sections"].update(entry["groups"])
-                else:
-                    teachers_record[teacher]["sections"].add(entry["groups"])
+            teachers_record[teacher]["sections"].update(entry.groups)
 
     # Check if teachers-record.csv exists and load existing data (preserve manual overrides)
-    teachers_record_file = "uploads/csv/teachers-record.csv"
+    teachers_record_file = TEACHERS_RECORD_FILE
     if os.path.exists(teachers_record_file):
         with open(teachers_record_file, "r", encoding="utf-8") as file:
             reader = csv.DictReader(file)
@@ -685,8 +1204,8 @@ def create_teachers_record_csv():
                         "Teacher's Employee code", ""
                     ).strip()
 
-    # Write the CSV file
-    with open(teachers_record_file, "w", newline="", encoding="utf-8") as file:
+    # Write the CSV file, unless it already holds these rows
+    with StringIO(newline="") as file:
         fieldnames = [
             "Teacher name",
             "Subjects/Courses",
@@ -713,136 +1232,254 @@ def create_teachers_record_csv():
                     "Teacher's Employee code": data["employee_code"],
                 }
             )
+        content = file.getvalue()
 
+    try:
+        with open(teachers_record_file, "r", newline="", encoding="utf-8") as existing:
+            if existing.read() == content:
+                return
+    except FileNotFoundError:
+        pass
+    with open(teachers_record_file, "w", newline="", encoding="utf-8") as file:
+        file.write(content)
 
-def process_file(file_path):
-    # Clear previous timetable data
-    timetable_data.clear()
-    teacher_names.clear()
-
-    # Temporary storage for merging consecutive slots
-    temp_entries = []
 
-    # Read CSV file
+def process_file(file_path, **source):
+    """Ingest a converted timetable CSV; source fields are passed on to process_records"""
     with open(file_path, "r", encoding="utf-8") as file:
-        csv_reader = csv.DictReader(file)
+        records = converter.rows_to_records(csv.DictReader(file))
 
-        for row in csv_reader:
-            day = row.get("Day", "").strip()
-            time = row.get("Time", "").strip()
-            room = row.get("Room", "").strip()
-            subject = row.get("Subject", "").strip()
-            group = row.get("Class/Group", "").strip()
-            teachers_str = row.get("Teacher(s) Name", "").strip()
+    process_records(records, **{"source_file": file_path, **source})
 
-            # Skip empty rows or rows with F25 placeholder
-            if not subject or subject == "F25" or not teachers_str:
-                continue
 
-            # Parse multiple teachers
-            teachers = parse_multiple_teachers(teachers_str)
+def group_records_by_teacher(records):
+    """Group records by each teacher they list, keeping record order"""
+    grouped = {}
+    for record in records:
+        for teacher in dict.fromkeys(record.teachers):
+            grouped.setdefault(teacher, []).append(record)
+    return {teacher: tuple(teacher_records) for teacher, teacher_records in grouped.items()}
 
-            if not teachers:
-                continue
 
-            # Add teachers to set
-            for teacher in teachers:
-                teacher_names.add(teacher)
+def slot_order_key(record):
+    """Sort key of a record in slot order"""
+    return (record.day, record.start_minutes, record.subject, record.room, str(list(record.teachers)))
 
-            # Parse and expand groups
-            expanded_groups = parse_groups(group)
 
-            # Extract start and end time
-            if "-" in time:
-                start_time, end_time = [t.strip() for t in time.split("-", 1)]
-            else:
-                start_time = end_time = time.strip()
-
-            temp_entry = {
-                "day": day,
-                "start_time": start_time,
-                "end_time": end_time,
-                "location": room,
-                "subject": subject,
-                "groups": expanded_groups,
-                "teachers": teachers,
-            }
-            temp_entries.append(temp_entry)
+def teacher_order_key(teacher, records):
+    """Where teacher first appears in slot order: the key of its first slot and its place among that slot's teachers"""
+    record = min(records, key=slot_order_key)
+    return slot_order_key(record), list(dict.fromkeys(record.teachers)).index(teacher)
+
+
+def build_teacher_entries(teacher, records, shared_entries=None):
+    """
+    Build one teacher's sorted timetable entries from the records listing them.
 
-    # Merge consecutive time slots
-    merged_entries = merge_consecutive_slots(temp_entries)
+    shared_entries maps TimetableEntry.identity() to entries already built
+    for other teachers, so a co-taught slot is one object in every
+    co-teacher's timetable.
+    """
+    if shared_entries is None:
+        shared_entries = {}
 
-    # Convert to final format and add to timetable_data
+    # Temporary storage for merging consecutive slots
+    temp_entries = [
+        {
+            "day": record.day,
+            "start_time": record.start_time,
+            "end_time": record.end_time,
+            "start_minutes": record.start_minutes,
+            "end_minutes": record.end_minutes,
+            "location": record.room,
+            "subject": record.subject,
+            "groups": list(record.groups),
+            "teachers": list(record.teachers),
+        }
+        for record in records
+    ]
+
+    # Merge consecutive time slots among the records of each set of
+    # co-teachers, which every one of them has, so all teachers of a class
+    # get the same merged entries whatever else they teach in between
+    records_by_teachers = {}
+    for entry in temp_entries:
+        records_by_teachers.setdefault(tuple(entry["teachers"]), []).append(entry)
+    merged_entries = sorted(
+        (merged for group in records_by_teachers.values() for merged in merge_consecutive_slots(group)),
+        key=merge_sort_key,
+    )
+
+    # Convert to final format
+    entries = []
+    seen_slots = set()
     for entry in merged_entries:
-        # Create entry for each individual teacher
-        for teacher in entry["teachers"]:
-            final_entry = {
-                "day": entry["day"],
-                "start_time": entry["start_time"],
-                "end_time": entry["end_time"],
-                "location": entry["location"],
-                "subject": entry["subject"],
-                "groups": entry["groups"],
-                "teachers": ", ".join(
-                    entry["teachers"]
-                ),  # Keep all teachers in the display
-            }
+        # Skip duplicates of a slot already added
+        slot_key = (
+            entry["day"],
+            entry["start_time"],
+            entry["end_time"],
+            entry["location"],
+            entry["subject"],
+        )
+        if slot_key in seen_slots:
+            continue
+        seen_slots.add(slot_key)
+
+        final_entry = TimetableEntry(
+            entry["day"],
+            entry["start_time"],
+            entry["end_time"],
+            entry["start_minutes"],
+            entry["end_minutes"],
+            entry["location"],
+            entry["subject"],
+            entry["groups"],
+            entry["teachers"],  # Keep all teachers in the display
+        )
+        entries.append(shared_entries.setdefault(final_entry.identity(), final_entry))
 
-            # Add entry to individual teacher's timetable
-            if teacher in timetable_data:
-                # Check for duplicates before adding
-                duplicate_found = False
-                for existing_entry in timetable_data[teacher]:
-                    if (
-                        existing_entry["day"] == final_entry["day"]
-                        and existing_entry["start_time"] == final_entry["start_time"]
-                        and existing_entry["end_time"] == final_entry["end_time"]
-                        and existing_entry["location"] == final_entry["location"]
-                        and existing_entry["subject"] == final_entry["subject"]
-                    ):
-                        duplicate_found = True
-                        break
-
-                if not duplicate_found:
-                    timetable_data[teacher].append(final_entry)
-            else:
-                timetable_data[teacher] = [final_entry]
+    # Sort the teacher's entries by day and time
+    return sort_entries_by_day_and_time(entries)
 
-    # Sort each teacher's entries by day and time
-    for teacher in timetable_data:
-        timetable_data[teacher] = sort_entries_by_day_and_time(timetable_data[teacher])
 
-    # Create teachers record CSV
-    create_teachers_record_csv()
+def process_records(records, **source):
+    """
+    Ingest converter.TimetableRecords into a new TimetableSnapshot and publish it.
 
+    Re-ingest is incremental: records are diffed against the current
+    snapshot's and only teachers whose records changed are rebuilt; the
+    others keep their existing entry lists. The snapshot is built off to
+    the side and published with a single reference swap, so concurrent
+    requests never see a cleared or half-built timetable.
 
-def normalize_time(time_str):
-    """Normalize time format for comparison"""
-    time_str = time_str.strip()
-    # Handle times like "01:30" vs "1:30"
-    if ":" in time_str:
-        parts = time_str.split(":")
-        hour = parts[0].zfill(2)  # Pad with leading zero if needed
-        minute = parts[1]
-        return f"{hour}:{minute}"
-    return time_str
+    source holds the snapshot's source fields (source_file, source_mtime,
+    modified, info); fields not given carry over from the current snapshot.
 
+    Returns the change set: the teachers rebuilt, the sections and rooms
+    of their entries and the fingerprint they changed "since".
+    """
+    global current_snapshot
+
+    previous = current_snapshot
+    records = tuple(records)
+    new_records_by_teacher = group_records_by_teacher(records)
+
+    # Teachers whose records were added, removed or changed
+    changed_teachers = {
+        teacher
+        for teacher in new_records_by_teacher.keys() | previous.records_by_teacher.keys()
+        if new_records_by_teacher.get(teacher) != previous.records_by_teacher.get(teacher)
+    }
+
+    # Records that differ between versions, counted per changed teacher
+    changed_records = set()
+    for teacher in changed_teachers:
+        old_counts = Counter(previous.records_by_teacher.get(teacher, ()))
+        new_counts = Counter(new_records_by_teacher.get(teacher, ()))
+        changed_records.update((new_counts - old_counts) + (old_counts - new_counts))
+
+    # Keep teachers in the order they first appear in slot order, so
+    # responses spanning several teachers list ties consistently; only the
+    # changed teachers' first slots are looked up again
+    previous_keys = previous.index.teacher_keys if previous.index.keyed else {}
+    teacher_keys = {
+        teacher: (
+            previous_keys[teacher]
+            if teacher not in changed_teachers and teacher in previous_keys
+            else teacher_order_key(teacher, teacher_records)
+        )
+        for teacher, teacher_records in new_records_by_teacher.items()
+    }
+    ordered_teachers = sorted(teacher_keys, key=teacher_keys.__getitem__)
+
+    # Co-taught slots are shared between teachers, including the unchanged
+    # co-teachers of changed ones
+    co_teachers = {
+        teacher
+        for changed in changed_teachers
+        for record in new_records_by_teacher.get(changed, ())
+        for teacher in record.teachers
+        if teacher not in changed_teachers and teacher in previous.timetable_data
+    }
+    shared_entries = {
+        entry.identity(): entry
+        for teacher in co_teachers
+        for entry in previous.timetable_data[teacher]
+    }
+    timetable_data = {
+        teacher: (
+            build_teacher_entries(teacher, new_records_by_teacher[teacher], shared_entries)
+            if teacher in changed_teachers
+            else previous.timetable_data[teacher]
+        )
+        for teacher in ordered_teachers
+    }
+
+    # Sections and rooms of every entry the changed teachers had or have:
+    # their lists in the index and the cached responses for them are redone
+    touched = [
+        entry
+        for teacher in changed_teachers
+        for entries in (previous.timetable_data.get(teacher, ()), timetable_data.get(teacher, ()))
+        for entry in entries
+    ]
+    changes = {
+        "since": previous.fingerprint,
+        "teachers": changed_teachers,
+        "sections": {group for entry in touched for group in entry.groups},
+        "rooms": {entry.location.strip() for entry in touched if entry.location.strip()},
+    }
+    index = TimetableIndex(timetable_data, teacher_keys, previous.index, changes)
+
+    if timetable_data.keys() == previous.teacher_names:
+        sorted_teachers = previous.sorted_teachers
+    else:
+        sorted_teachers = sort_teachers_by_prefix_and_name(timetable_data)
+
+    # Date the data by when it was published. Unlike file mtimes this only
+    # moves forward, also for a workbook reverted or copied with an old mtime;
+    # HTTP dates have whole seconds, so each new version gets a later second
+    fingerprint = hashlib.sha256(repr(records).encode()).hexdigest()
+    modified = previous.modified
+    if fingerprint != previous.fingerprint or modified is None:
+        modified = datetime.now(timezone.utc).replace(microsecond=0)
+        if previous.modified and modified <= previous.modified:
+            modified = previous.modified + timedelta(seconds=1)
+
+    snapshot = TimetableSnapshot(
+        version=previous.version + 1,
+        fingerprint=fingerprint,
+        records=records,
+        records_by_teacher=new_records_by_teacher,
+        timetable_data=timetable_data,
+        sorted_teachers=sorted_teachers,
+        index=index,
+        changes=changes,
+        source_file=source.get("source_file", previous.source_file),
+        source_mtime=source.get("source_mtime", previous.source_mtime),
+        modified=modified,
+        info=source.get("info", previous.info),
+    )
 
-def time_to_minutes(time_str):
-    """Convert time string to minutes for proper sorting"""
-    time_str = normalize_time(time_str)
-    if ":" in time_str:
-        hour, minute = time_str.split(":")
-        hour = int(hour)
-        minute = int(minute)
+    # Publish the new snapshot
+    current_snapshot = snapshot
+    carry_over_caches(previous, snapshot)
+    print(
+        f"Re-ingested {len(changed_teachers & snapshot.teacher_names)} of {len(snapshot.teacher_names)} teachers "
+        f"({len(changed_records)} changed records)"
+    )
 
-        # Handle 12-hour format without AM/PM indicators
-        # Assume times 1-7 are PM (13-19), times 8-12 are AM (8-12)
-        if hour >= 1 and hour <= 7:
-            hour += 12  # Convert to 24-hour format
+    # Update teachers record CSV; it is only rewritten if a teacher's row changed
+    if changed_teachers or not os.path.exists(TEACHERS_RECORD_FILE):
+        create_teachers_record_csv(snapshot.timetable_data)
 
-        return hour * 60 + minute
-    return 0
+    return changes
+
+
+def merge_sort_key(entry):
+    """Sort key of merge_consecutive_slots: day, start time, subject, location, teachers"""
+    return (entry["day"], entry["start_minutes"], entry["subject"], entry["location"], str(entry["teachers"]))
 
 
 def merge_consecutive_slots(entries):
@@ -851,15 +1488,7 @@ def merge_consecutive_slots(entries):
         return []
 
     # Sort entries by day, start_time, subject, location, teachers
-    entries.sort(
-        key=lambda x: (
-            x["day"],
-            time_to_minutes(x["start_time"]),
-            x["subject"],
-            x["location"],
-            str(x["teachers"]),
-        )
-    )
+    entries.sort(key=merge_sort_key)
 
     merged = []
     current = entries[0].copy()
@@ -867,17 +1496,13 @@ def merge_consecutive_slots(entries):
     for i in range(1, len(entries)):
         entry = entries[i]
 
-        # Normalize times for comparison
-        current_end = normalize_time(current["end_time"])
-        entry_start = normalize_time(entry["start_time"])
-
         # Check if this entry can be merged with current
         same_day = current["day"] == entry["day"]
         same_subject = current["subject"] == entry["subject"]
         same_location = current["location"] == entry["location"]
         same_groups = current["groups"] == entry["groups"]
         same_teachers = set(current["teachers"]) == set(entry["teachers"])
-        consecutive_time = current_end == entry_start
+        consecutive_time = current["end_minutes"] == entry["start_minutes"]
 
         if (
             same_day
@@ -895,6 +1520,7 @@ def merge_consecutive_slots(entries):
 
             # Merge by extending end time
             current["end_time"] = entry["end_time"]
+            current["end_minutes"] = entry["end_minutes"]
         else:
             # Can't merge, add current to merged list and start new
             merged.append(current)
@@ -907,62 +1533,78 @@ def merge_consecutive_slots(entries):
 
 def sort_entries_by_day_and_time(entries):
     """Sort entries by day order and then by time"""
-    day_order = [
-        "Monday",
-        "Tuesday",
-        "Wednesday",
-        "Thursday",
-        "Friday",
-        "Saturday",
-        "Sunday",
-    ]
-
-    def day_time_key(entry):
-        day = entry.get("day", "")
-        start_time = entry.get("start_time", "")
-
-        # Get day index
-        day_index = day_order.index(day) if day in day_order else 999
-
-        # Convert time to comparable format (remove colons, pad with zeros)
-        time_parts = start_time.replace(":", "").strip()
-        time_num = int(time_parts) if time_parts.isdigit() else 0
-
-        return (day_index, time_num)
-
     return sorted(entries, key=day_time_key)
 
 
-def generate_cards_html():
-    card_html = ""
-    sorted_teachers = sort_teachers_by_prefix_and_name(teacher_names)
-    for teacher in sorted_teachers:
-        entries = timetable_data.get(teacher, [])
-        card_html += f'<div class="teacher-timetable" id="{teacher.replace(" ", "_")}">'
-        card_html += '<div class="card">'
-        card_html += (
-            f'<h5 class="card-title"><i class="fas fa-user-tie"></i>{teacher}</h5>'
-        )
-        card_html += '<div class="table-container">'
-        card_html += '<div class="table-responsive">'
-        card_html += '<table class="table">'
-        card_html += '<thead><tr><th><i class="fas fa-calendar-day mr-2"></i>Day</th><th><i class="fas fa-clock mr-2"></i>Start Time</th><th><i class="fas fa-clock mr-2"></i>End Time</th><th><i class="fas fa-map-marker-alt mr-2"></i>Location</th><th><i class="fas fa-book mr-2"></i>Subject</th><th><i class="fas fa-users mr-2"></i>Groups</th></tr></thead><tbody>'
+CARD_TABLE_HEADER = (
+    '<thead><tr><th><i class="fas fa-calendar-day mr-2"></i>Day</th><th><i class="fas fa-clock mr-2"></i>Start Time</th>'
+    '<th><i class="fas fa-clock mr-2"></i>End Time</th><th><i class="fas fa-map-marker-alt mr-2"></i>Location</th>'
+    '<th><i class="fas fa-book mr-2"></i>Subject</th><th><i class="fas fa-users mr-2"></i>Groups</th></tr></thead>'
+)
 
-        for entry in entries:
-            card_html += f"<tr class='timetable-row' data-teacher='{teacher}'>"
-            card_html += f"<td>{entry['day']}</td>"
-            card_html += f"<td>{entry['start_time']}</td>"
-            card_html += f"<td>{entry['end_time']}</td>"
-            card_html += f"<td>{entry['location']}</td>"
-            card_html += f"<td>{entry['subject']}</td>"
-            card_html += f"<td>{entry['groups']}</td></tr>"
-
-        card_html += "</tbody></table>"
-        card_html += "</div>"
-        card_html += "</div>"
-        card_html += "</div>"
-        card_html += "</div>"
-    return card_html
+
+def render_teacher_card(teacher, entries):
+    """HTML card of one teacher's timetable, with every value escaped"""
+    name = html.escape(teacher)
+    parts = [
+        f'<div class="teacher-timetable" id="{html.escape(teacher.replace(" ", "_"))}">',
+        '<div class="card">',
+        f'<h5 class="card-title"><i class="fas fa-user-tie"></i>{name}</h5>',
+        '<div class="table-container"><div class="table-responsive"><table class="table">',
+        CARD_TABLE_HEADER,
+        "<tbody>",
+    ]
+    for entry in entries:
+        cells = (entry.day, entry.start_time, entry.end_time, entry.location, entry.subject, str(list(entry.groups)))
+        parts.append(f"<tr class='timetable-row' data-teacher='{name}'>")
+        parts.extend(f"<td>{html.escape(cell)}</td>" for cell in cells)
+        parts.append("</tr>")
+    parts.append("</tbody></table></div></div></div></div>")
+    return "".join(parts)
+
+
+def get_teacher_card(snapshot, teacher):
+    """Card HTML of teacher in snapshot, rendered once per data version"""
+    global teacher_cards
+
+    version, cards = teacher_cards
+    if version != snapshot.version:
+        cards = {}
+        teacher_cards = (snapshot.version, cards)
+    card = cards.get(teacher)
+    if card is None:
+        card = cards[teacher] = render_teacher_card(teacher, snapshot.timetable_data[teacher])
+    return card
+
+
+@app.route("/cards")
+@conditional_response()
+def get_cards():
+    """
+    Teacher cards as an HTML fragment: one teacher (?teacher=<name>) or a
+    page of them in index order (?page=<n>&per_page=<n>). X-Total-Count
+    holds the number of teachers.
+    """
+    snapshot = current_snapshot
+    teacher = request.args.get("teacher", "").strip().upper()
+    if teacher:
+        if teacher not in snapshot.timetable_data:
+            return jsonify({"error": f"No timetable found for {teacher}"}), 404
+        teachers = [teacher]
+    else:
+        try:
+            page = max(int(request.args.get("page", 1)), 1)
+            per_page = min(max(int(request.args.get("per_page", CARDS_PER_PAGE)), 1), MAX_CARDS_PER_PAGE)
+        except ValueError:
+            return jsonify({"error": "page and per_page must be numbers"}), 400
+        teachers = snapshot.sorted_teachers[(page - 1) * per_page : page * per_page]
+
+    response = app.response_class(
+        "".join(get_teacher_card(snapshot, teacher) for teacher in teachers),
+        mimetype="text/html",
+    )
+    response.headers["X-Total-Count"] = str(len(snapshot.sorted_teachers))
+    return response
 
 
 def sort_teachers_by_prefix_and_name(teachers):
@@ -986,118 +1628,139 @@ def sort_teachers_by_prefix_and_name(teachers):
 
 
 @app.route("/section/<int:semester>")
+@conditional_response()
+@cached_response
 def get_section_by_semester(semester):
     """Get all sections for a specific semester number"""
     sections_data = []
 
-    for entries in timetable_data.values():
+    for entries in current_snapshot.timetable_data.values():
         for entry in entries:
-            groups = entry["groups"]
-            if groups:
-                if isinstance(groups, list):
-                    # Check if any group contains the semester number
-                    matching_groups = [
-                        group for group in groups if str(semester) in group
-                    ]
-                    if matching_groups:
-                        entry_copy = entry.copy()
-                        entry_copy["groups"] = matching_groups
-                        sections_data.append(entry_copy)
-                else:
-                    if str(semester) in groups:
-                        sections_data.append(entry)
+            # Check if any group contains the semester number
+            matching_groups = [
+                group for group in entry.groups if str(semester) in group
+            ]
+            if matching_groups:
+                sections_data.append((entry, matching_groups))
 
     # Sort the data by day and time before returning
-    sorted_data = sort_entries_by_day_and_time(sections_data)
+    sections_data.sort(key=lambda item: item[0].sort_key)
+
+    sorted_data = []
+    for entry, matching_groups in sections_data:
+        entry_dict = entry.as_dict()
+        entry_dict["groups"] = matching_groups
+        sorted_data.append(entry_dict)
 
     return jsonify(sorted_data)
 
 
 @app.route("/section/<int:semester>/download")
+@conditional_response()
 def download_section_by_semester(semester):
     """Download all sections for a specific semester as Excel file"""
+    snapshot = current_snapshot
     sections_data = []
 
-    for entries in timetable_data.values():
+    for entries in snapshot.timetable_data.values():
         for entry in entries:
-            groups = entry["groups"]
-            if groups:
-                if isinstance(groups, list):
-                    matching_groups = [
-                        group for group in groups if str(semester) in group
-                    ]
-                    if matching_groups:
-                        for group in matching_groups:
-                            entry_copy = entry.copy()
-                            entry_copy["section"] = group
-                            entry_copy["groups_display"] = ", ".join(
-                                entry_copy["groups"]
-                            )
-                            sections_data.append(entry_copy)
-                else:
-                    if str(semester) in groups:
-                        entry_copy = entry.copy()
-                        entry_copy["section"] = groups
-                        entry_copy["groups_display"] = groups
-                        sections_data.append(entry_copy)
+            for group in entry.groups:
+                if str(semester) in group:
+                    sections_data.append((group, entry))
 
     if not sections_data:
         return jsonify({"error": f"No data found for semester {semester}"}), 404
 
-    # Define day order for proper sorting
-    day_order = [
-        "Monday",
-        "Tuesday",
-        "Wednesday",
-        "Thursday",
-        "Friday",
-        "Saturday",
-        "Sunday",
-    ]
-
     def get_day_index(day):
-        return day_order.index(day) if day in day_order else 999
+        return DAY_ORDER.index(day) if day in DAY_ORDER else 999
 
     # Sort by section first, then by day order, then by time
     sections_data.sort(
-        key=lambda x: (
-            x["section"],
-            get_day_index(x["day"]),
-            time_to_minutes(x["start_time"]),
+        key=lambda item: (
+            item[0],
+            get_day_index(item[1].day),
+            item[1].start_minutes,
         )
     )
 
-    # Create DataFrame
-    df_data = []
-    for entry in sections_data:
-        df_data.append(
-            {
-                "Section": entry["section"],
-                "Day": entry["day"],
-                "Start Time": entry["start_time"],
-                "End Time": entry["end_time"],
-                "Subject": entry["subject"],
-                "Location": entry["location"],
-                "Teachers": entry["teachers"],
-            }
+    def build():
+        columns = ["Section", "Day", "Start Time", "End Time", "Subject", "Location", "Teachers"]
+        rows = (
+            [section, entry.day, entry.start_time, entry.end_time, entry.subject, entry.location, entry.teachers]
+            for section, entry in sections_data
         )
+        workbook = XlsxWorkbook()
+        workbook.add_sheet(f"Semester {semester}", columns, rows)
+        return workbook.to_bytes()
 
-    df = pd.DataFrame(df_data)
+    return cached_export(f"semester_{semester}_timetable.xlsx", build, snapshot.fingerprint)
 
-    # Create Excel file in memory
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name=f"Semester {semester}", index=False)
 
-    output.seek(0)
+# Sheet groupings of the department workbook and the columns of each sheet
+DEPARTMENT_GROUPINGS = ["section", "teacher", "room"]
+DEPARTMENT_COLUMNS = ["Day", "Start Time", "End Time", "Subject", "Location", "Sections", "Teachers"]
 
-    return send_file(
-        output,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        as_attachment=True,
-        download_name=f"semester_{semester}_timetable.xlsx",
+
+def department_sheets(snapshot, grouping):
+    """(name, entries sorted by day and time) for every section, teacher or room of snapshot"""
+    index = snapshot.index
+    if grouping == "teacher":
+        # Teacher timetables are stored sorted
+        for teacher in snapshot.sorted_teachers:
+            yield teacher, snapshot.timetable_data[teacher]
+        return
+
+    if grouping == "section":
+        names, lists = index.sections.names, index.by_section
+    else:
+        names, lists = index.rooms.names, index.by_room
+    for name in names:
+        yield name, [entry for _, entry in lists[name]]
+
+
+@app.route("/department/xlsx")
+@conditional_response()
+def download_department():
+    """Download one workbook with a sheet per section, teacher or room (?by=section,teacher,room)"""
+    snapshot = current_snapshot
+    groupings = list(
+        dict.fromkeys(
+            grouping.strip().lower()
+            for grouping in request.args.get("by", "section").split(",")
+            if grouping.strip()
+        )
     )
+    unknown = [grouping for grouping in groupings if grouping not in DEPARTMENT_GROUPINGS]
+    if unknown or not groupings:
+        return jsonify({"error": f"Unknown sheet grouping, use one or more of: {', '.join(DEPARTMENT_GROUPINGS)}"}), 400
+    if not snapshot.timetable_data:
+        return jsonify({"error": "No timetable data loaded"}), 404
+
+    def build():
+        workbook = XlsxWorkbook()
+        for grouping in groupings:
+            for name, entries in department_sheets(snapshot, grouping):
+                rows = (
+                    [
+                        entry.day,
+                        entry.start_time,
+                        entry.end_time,
+                        entry.subject,
+                        entry.location,
+                        ", ".join(entry.groups),
+                        entry.teachers,
+                    ]
+                    for entry in entries
+                )
+                workbook.add_sheet(name, DEPARTMENT_COLUMNS, rows)
+        return workbook.to_bytes()
+
+    return cached_export(f"department_{'_'.join(groupings)}.xlsx", build, snapshot.fingerprint)
+
 
+# Load the persisted snapshot at import, i.e. in the gunicorn master when preloading
+if WARM_START:
+    warm_start()
 
 # if __name__ == '__main__':
 #     app.run(debug=True)
@@ -0,0 +1,122 @@
+"""
+Converter benchmark on synthetic timetable workbooks.
+
+Generates a workbook with benchmarks.synthetic_workbook, then runs
+converter.extract_timetable_rows (the app's conversion path) and the CSV
+write for each reader and worker count, reporting wall time and peak
+traced memory per phase and checking that every configuration extracts
+identical rows. Memory is traced in this process only, so it leaves out
+the worker processes of a parallel run.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_converter --scale 10
+    python -m benchmarks.bench_converter --sheets 4 --workers 1,4 --readers stream
+"""
+
+from contextlib import contextmanager, redirect_stdout
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import converter  # noqa: E402
+from benchmarks.synthetic_workbook import build_workbook  # noqa: E402
+
+
+@contextmanager
+def measure(results, phase, trace_memory):
+    """Record wall time (and traced peak memory) of a phase into results"""
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    yield
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    results.append((phase, wall, peak))
+
+
+def run_conversion(path, output, reader, workers, trace_memory=False):
+    """Extract the rows as the app does, then write the CSV; return (phase results, report, rows)"""
+    results = []
+    report = converter.ConversionReport(path)
+    with redirect_stdout(io.StringIO()):
+        with measure(results, "extract", trace_memory):
+            rows = converter.extract_timetable_rows(path, reader, workers, report=report)
+        with measure(results, "write", trace_memory):
+            converter.write_rows_csv(rows, output)
+    return results, report, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--sheets", type=int, default=2)
+    parser.add_argument("--merge-density", type=float, default=0.2)
+    parser.add_argument("--fill", type=float, default=0.7)
+    parser.add_argument("--scale", type=int, default=1, help="multiply the number of sheets")
+    parser.add_argument("--readers", default="openpyxl,stream")
+    parser.add_argument("--workers", default="1,0", help="comma-separated worker counts, 1 = serial, 0 = one per CPU")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced-memory pass")
+    parser.add_argument("--keep", help="save the generated workbook to this path")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="converter-bench-")
+    path = args.keep or os.path.join(workdir, "synthetic.xlsx")
+    output = os.path.join(workdir, "synthetic.csv")
+
+    start = time.perf_counter()
+    cells, merges = build_workbook(
+        path,
+        days=args.days,
+        rooms=args.rooms,
+        slots=args.slots,
+        sheets=args.sheets * args.scale,
+        merge_density=args.merge_density,
+        fill=args.fill,
+        seed=args.seed,
+    )
+    print(
+        f"Workbook: {args.sheets * args.scale} sheet(s), {cells} class cells, {merges} merged ranges, "
+        f"{os.path.getsize(path) / 1024:.0f} KiB (generated in {time.perf_counter() - start:.1f}s)"
+    )
+
+    reference = None
+    for reader in args.readers.split(","):
+        for workers in [int(w) for w in args.workers.split(",")]:
+            timings, report, rows = run_conversion(path, output, reader, workers)
+            if not args.no_memory:
+                tracemalloc.start()
+                memory, _, _ = run_conversion(path, output, reader, workers, trace_memory=True)
+                tracemalloc.stop()
+            else:
+                memory = [(phase, None, None) for phase, _, _ in timings]
+
+            print(f"\nreader={reader} workers={workers} rows={len(rows)}")
+            print(f"  {'phase':<16}{'wall (s)':>10}{'peak (MiB)':>12}")
+            for (phase, wall, _), (_, _, peak) in zip(timings, memory):
+                peak_text = f"{peak / 2**20:.1f}" if peak is not None else "-"
+                print(f"  {phase:<16}{wall:>10.3f}{peak_text:>12}")
+            print(f"  {'total':<16}{sum(wall for _, wall, _ in timings):>10.3f}")
+            print("  extract phases: " + ", ".join(f"{name} {timing['wall']:.3f}s" for name, timing in report.phases.items()))
+
+            if reference is None:
+                reference = rows
+            elif rows != reference:
+                print("  PARITY FAILURE: rows differ from the first configuration")
+                return 1
+
+    print("\nAll configurations extracted identical rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Ingest benchmark: time to build teacher timetables as entries per teacher grow.
+
+Generates converter.TimetableRecords for a handful of teachers with a
+growing number of distinct sessions each (plus a share of duplicate
+rows, as co-listed and repeated cells produce), runs app.process_records
+on them and reports the time per entry. With set-based deduplication the
+time per entry stays roughly flat; the old linear duplicate scan made it
+grow with the number of entries per teacher.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ingest
+    python -m benchmarks.bench_ingest --entries 500,1000,2000,4000,8000 --teachers 8
+"""
+
+from contextlib import redirect_stdout
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import converter  # noqa: E402
+from snapshot import TimetableSnapshot  # noqa: E402
+from benchmarks.synthetic_workbook import DAYS, SUBJECTS, TITLES  # noqa: E402
+
+
+def clock(minutes):
+    """12-hour clock text of a minute offset, as the converter emits it"""
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d}"
+
+
+def build_records(teachers, entries_per_teacher, duplicate_share=0.2, seed=0):
+    """Records giving each teacher entries_per_teacher distinct sessions plus duplicates"""
+    rng = random.Random(seed)
+    names = [f"{TITLES[i % len(TITLES)]} Teacher {i}".upper() for i in range(teachers)]
+    records = []
+    for name in names:
+        for session in range(entries_per_teacher):
+            # Spread sessions over days, 10-minute start offsets and rooms so each is distinct
+            day = DAYS[session % len(DAYS)]
+            start = 8 * 60 + (session // len(DAYS)) % 60 * 10
+            room = f"Lecture Room # {session // (len(DAYS) * 60) + 1:03d}"
+            record = converter.TimetableRecord(
+                day=day,
+                start_time=clock(start),
+                end_time=clock(start + 5),
+                start_minutes=converter.clock_to_minutes(clock(start)),
+                end_minutes=converter.clock_to_minutes(clock(start + 5)),
+                room=room,
+                subject=rng.choice(SUBJECTS),
+                groups=(f"BSSE-{rng.randint(1, 8)}{rng.choice('ABCDE')}",),
+                teachers=(name,),
+            )
+            records.append(record)
+            if rng.random() < duplicate_share:
+                records.append(record)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", default="250,500,1000,2000,4000", help="comma-separated entries per teacher")
+    parser.add_argument("--teachers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with redirect_stdout(io.StringIO()):
+        import app
+
+    # Keep the benchmark's teachers-record.csv away from the real one
+    app.TEACHERS_RECORD_FILE = os.path.join(tempfile.mkdtemp(prefix="ingest-bench-"), "teachers-record.csv")
+
+    print(f"{'entries/teacher':>16}{'records':>10}{'ingest (s)':>12}{'us/entry':>10}")
+    for entries_per_teacher in [int(n) for n in args.entries.split(",")]:
+        records = build_records(args.teachers, entries_per_teacher, seed=args.seed)
+        best = None
+        for _ in range(args.repeat):
+            # Start from empty data so every teacher is rebuilt
+            app.current_snapshot = TimetableSnapshot()
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                app.process_records(records)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        entries = args.teachers * entries_per_teacher
+        print(f"{entries_per_teacher:>16}{len(records):>10}{best:>12.3f}{best / entries * 1e6:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Memory benchmark: compact slotted entries against the old dict-per-entry layout.
+
+Builds a synthetic workbook (by default ten times the size of a typical
+department timetable), converts it to records, then measures the traced
+memory the teacher timetables take in each layout:
+
+- dicts: one seven-key dict per entry and per co-teacher, with a fresh
+  groups list and joined teachers string each (the layout before
+  entries.TimetableEntry)
+- compact: app.build_teacher_entries, i.e. shared, slotted entries with
+  interned strings, integer minutes and teacher ids
+
+The records themselves are alive in both cases and not counted.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --scale 1
+"""
+
+from contextlib import redirect_stdout
+import argparse
+import gc
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import converter  # noqa: E402
+from benchmarks.synthetic_workbook import build_workbook  # noqa: E402
+
+
+def dict_layout(records_by_teacher):
+    """Teacher timetables in the old layout: a dict per entry, copied per co-teacher"""
+    timetable_data = {}
+    for teacher, records in records_by_teacher.items():
+        entries = []
+        seen_slots = set()
+        for record in records:
+            slot_key = (record.day, record.start_time, record.end_time, record.room, record.subject)
+            if slot_key in seen_slots:
+                continue
+            seen_slots.add(slot_key)
+            entries.append(
+                {
+                    "day": record.day,
+                    "start_time": record.start_time,
+                    "end_time": record.end_time,
+                    "location": record.room,
+                    "subject": record.subject,
+                    "groups": list(record.groups),
+                    "teachers": ", ".join(record.teachers),
+                }
+            )
+        timetable_data[teacher] = entries
+    return timetable_data
+
+
+def compact_layout(app, records_by_teacher):
+    """Teacher timetables as built by the app"""
+    shared_entries = {}
+    return {
+        teacher: app.build_teacher_entries(teacher, records, shared_entries)
+        for teacher, records in records_by_teacher.items()
+    }
+
+
+def traced_size(build, *args):
+    """Return (result, bytes allocated by build and still alive)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(*args)
+    gc.collect()  # Drop the temporaries of the build
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=10, help="multiply the base timetable's sheets")
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--rooms", type=int, default=8)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with redirect_stdout(io.StringIO()):
+        import app
+
+    path = os.path.join(tempfile.mkdtemp(prefix="memory-bench-"), "synthetic.xlsx")
+    build_workbook(path, days=args.days, rooms=args.rooms, slots=args.slots, sheets=args.scale, seed=args.seed)
+    with redirect_stdout(io.StringIO()):
+        records = converter.extract_timetable_records(path, reader="stream")
+    records_by_teacher = app.group_records_by_teacher(records)
+
+    dicts, dict_bytes = traced_size(dict_layout, records_by_teacher)
+    compact, compact_bytes = traced_size(compact_layout, app, records_by_teacher)
+
+    entries = sum(len(entries) for entries in dicts.values())
+    distinct = len({id(entry) for entries in compact.values() for entry in entries})
+    print(
+        f"Timetable: {len(records)} records, {len(records_by_teacher)} teachers, "
+        f"{entries} teacher entries ({distinct} distinct slots)"
+    )
+    print(f"  {'layout':<10}{'MiB':>10}{'bytes/entry':>14}")
+    for layout, size in (("dicts", dict_bytes), ("compact", compact_bytes)):
+        print(f"  {layout:<10}{size / 2**20:>10.2f}{size / entries:>14.0f}")
+    print(f"  compact uses {compact_bytes / dict_bytes:.0%} of the dict layout")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Startup benchmark: import time and resident memory of one app worker.
+
+Each run starts a fresh interpreter (as a gunicorn worker would), imports
+app, then serves the JSON timetable API and reports import time, RSS
+after import and after serving, and which heavy libraries (pandas,
+openpyxl, Pillow) ended up loaded. The "eager" mode imports those
+libraries up front first (the ones installed), which is what every
+worker paid when app.py imported them at module level.
+
+The runs work on a temporary copy of uploads/, primed once so every run
+warm-starts from the same persisted snapshot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --modes lazy
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "openpyxl", "PIL"]
+
+JSON_PATHS = ["/get_sections", "/get_rooms", "/timetable", "/get_teachers", "/section/1"]
+
+# Runs in the worker process; prints one JSON line of measurements
+WORKER = """
+from contextlib import redirect_stdout
+import io, json, resource, sys, time
+
+sys.path.insert(0, {root!r})
+heavy, eager, paths = {heavy!r}, {eager!r}, {paths!r}
+
+
+def rss_mib():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def resident():
+    return [name for name in heavy if name in sys.modules]
+
+
+start = time.perf_counter()
+with redirect_stdout(io.StringIO()):
+    if eager:
+        for name in heavy:
+            try:
+                __import__(name)
+            except ImportError:  # pandas is no longer a requirement
+                pass
+    import app
+import_seconds = time.perf_counter() - start
+import_rss, import_modules = rss_mib(), resident()
+
+with redirect_stdout(io.StringIO()):
+    if not app.current_snapshot.timetable_data:
+        app.refresh_timetable()
+    for path in paths:
+        with app.app.test_request_context(path):
+            app.app.dispatch_request()
+
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "import_rss": import_rss,
+    "import_modules": import_modules,
+    "serve_rss": rss_mib(),
+    "serve_modules": resident(),
+    "teachers": len(app.current_snapshot.timetable_data),
+}}))
+"""
+
+
+def run_worker(workdir, eager):
+    """Start one worker process in workdir and return its measurements"""
+    code = WORKER.format(root=ROOT, heavy=HEAVY_MODULES, eager=eager, paths=JSON_PATHS)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=workdir, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="worker starts per mode (median reported)")
+    parser.add_argument("--modes", default="lazy,eager", help="comma-separated: lazy, eager")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    shutil.copytree(os.path.join(ROOT, "uploads"), os.path.join(workdir, "uploads"))
+    primed = run_worker(workdir, eager=False)  # Converts, ingests and writes the snapshot
+    print(f"Timetable: {primed['teachers']} teachers, {len(JSON_PATHS)} JSON routes served per run")
+
+    print(f"  {'mode':<8}{'import (s)':>12}{'MiB imported':>14}{'MiB serving':>13}  heavy modules loaded")
+    for mode in args.modes.split(","):
+        runs = [run_worker(workdir, eager=mode == "eager") for _ in range(args.runs)]
+        import_seconds = statistics.median(run["import_seconds"] for run in runs)
+        import_rss = statistics.median(run["import_rss"] for run in runs)
+        serve_rss = statistics.median(run["serve_rss"] for run in runs)
+        modules = ", ".join(runs[-1]["serve_modules"]) or "none"
+        print(f"  {mode:<8}{import_seconds:>12.3f}{import_rss:>14.1f}{serve_rss:>13.1f}  {modules}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
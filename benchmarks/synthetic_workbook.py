@@ -0,0 +1,127 @@
+"""
+Synthetic timetable workbook generator for the converter benchmarks.
+
+Workbooks follow the layout converter.detect_day_blocks expects: a day
+name in column B, a "Rooms" row below it carrying the time slots in
+columns C onwards, then one row per room with multi-line class cells
+("Subject\\nBSSE-4C\\nMr. Teacher"), some merged across consecutive slots.
+"""
+
+import random
+
+from openpyxl import Workbook
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+PROGRAMS = ["BSSE", "BSCS", "BSAI", "BSDS", "BSIT"]
+TITLES = ["Mr.", "Ms.", "Dr.", "Prof.", "Mrs."]
+SUBJECTS = [
+    "Programming Fundamentals",
+    "Object Oriented Programming",
+    "Data Structures",
+    "Computer Networks",
+    "Operating Systems",
+    "Database Systems",
+    "Software Engineering",
+    "Discrete Structures",
+    "Calculus & Analytical Geometry",
+    "Probability & Statistics",
+    "Artificial Intelligence",
+    "Generative AI",
+]
+
+# detect_day_blocks looks for time slots in columns C..S and rooms in the
+# 20 rows below a day's time row
+MAX_SLOTS = 17
+MAX_ROOMS = 20
+
+
+def slot_label(slot):
+    """Time range of the nth 80-minute slot, in the workbook's 12-hour style"""
+    start = 8 * 60 + slot * 85
+    end = start + 80
+
+    def clock(minutes):
+        hour, minute = divmod(minutes, 60)
+        return f"{(hour - 1) % 12 + 1}:{minute:02d}"
+
+    return f"{clock(start)} - {clock(end)}"
+
+
+def cell_text(rng, teachers):
+    """Random multi-line class cell in the formats the converter understands"""
+    program = rng.choice(PROGRAMS)
+    semester = rng.randint(1, 8)
+    section = rng.choice("ABCDE")
+    style = rng.random()
+    if style < 0.15:
+        group = f"{program}/{rng.choice(PROGRAMS)}-{semester}{section}"
+    elif style < 0.3:
+        group = f"{program}-{semester}A,{program}-{semester}B"
+    else:
+        group = f"{program}-{semester}{section}"
+
+    lines = [rng.choice(SUBJECTS), group]
+    teacher = rng.choice(teachers)
+    if rng.random() < 0.1:
+        lines.append(f"{teacher} (10:45 AM TO 12:25 PM)")
+    else:
+        lines.append(teacher)
+    return "\n".join(lines)
+
+
+def build_workbook(filename, days=6, rooms=20, slots=8, sheets=1, merge_density=0.2, fill=0.7, seed=0):
+    """
+    Write a synthetic timetable workbook and return its (cells, merged ranges) counts.
+
+    days, rooms and slots are per day block (rooms and slots are capped at
+    what detect_day_blocks scans); sheets repeats the whole week per sheet.
+    merge_density is the share of class cells merged with the next slot and
+    fill the share of room/slot cells holding a class.
+    """
+    rng = random.Random(seed)
+    rooms = min(rooms, MAX_ROOMS)
+    slots = min(slots, MAX_SLOTS)
+    teachers = [
+        f"{rng.choice(TITLES)} Teacher {index}" for index in range(max(10, rooms * 2))
+    ]
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    cell_count = 0
+    merge_count = 0
+
+    for sheet_index in range(sheets):
+        ws = wb.create_sheet(f"Timetable {sheet_index + 1}")
+        row = 1
+        for day_index in range(days):
+            ws.cell(row=row, column=2, value=DAYS[day_index % len(DAYS)])
+            ws.cell(row=row + 1, column=2, value="Rooms")
+            for slot in range(slots):
+                ws.cell(row=row + 1, column=3 + slot, value=slot_label(slot))
+
+            for room in range(rooms):
+                room_row = row + 2 + room
+                ws.cell(row=room_row, column=2, value=f"Lecture Room # {room + 1:02d}")
+                slot = 0
+                while slot < slots:
+                    if rng.random() >= fill:
+                        slot += 1
+                        continue
+                    column = 3 + slot
+                    ws.cell(row=room_row, column=column, value=cell_text(rng, teachers))
+                    cell_count += 1
+                    if slot + 1 < slots and rng.random() < merge_density:
+                        ws.merge_cells(
+                            start_row=room_row, start_column=column,
+                            end_row=room_row, end_column=column + 1,
+                        )
+                        merge_count += 1
+                        slot += 2
+                    else:
+                        slot += 1
+
+            # Two blank rows end the block's room list
+            row += 2 + rooms + 2
+
+    wb.save(filename)
+    return cell_count, merge_count
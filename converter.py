@@ -1,9 +1,36 @@
-from openpyxl.utils import get_column_letter
-from openpyxl import load_workbook
 from datetime import datetime
-import pandas as pd
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
+import json
+import csv
 import re
 import os
+import time
+
+# Bump whenever a change to the extraction logic alters its output,
+# so cached conversions of unchanged workbooks are invalidated
+CONVERTER_VERSION = "2"
+
+# Column layout of the converted timetable CSV
+CSV_COLUMNS = ["Day", "Time", "Room", "Subject", "Class/Group", "Teacher(s) Name"]
+
+# Number of workbook conversions kept in the conversion cache
+CACHE_MAX_ENTRIES = 8
+
+# Precompiled patterns for cell text and time values
+TIME_RANGE_PATTERN = re.compile(r'\d{1,2}:\d{2}\s*[-–]\s*\d{1,2}:\d{2}')
+TITLE_DOT_PATTERN = re.compile(r'\b(Mr|Ms|Mrs|Dr|Prof|Sir|Madam)\.([A-Z])', re.IGNORECASE)
+TITLE_ATTACHED_PATTERN = re.compile(r'\b(Mr|Ms|Mrs|Dr|Prof)([A-Z][a-z])')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SHARED_SECTION_PATTERN = re.compile(r'\b([A-Z]{4})/([A-Z]{4})-(\d+[A-Za-z]*)\b')
+SLASHED_GROUPS_PATTERN = re.compile(r'\b([A-Z]{4}-\d+[A-Za-z]*)/([A-Z]{4}-\d+[A-Za-z]*)\b')
+COMMA_GROUPS_PATTERN = re.compile(r'([A-Z]{4}-\d+[A-Za-z]*)[,]([A-Z]{4}-\d+[A-Za-z]*)')
+TAB_SEPARATED_TIMES_PATTERN = re.compile(r'(\d{1,2}:\d{2})\s*\t\s*(\d{1,2}:\d{2})')
+DASH_PATTERN = re.compile(r'\s*-\s*')
+FIRST_TIME_PATTERN = re.compile(r'(\d{1,2}:\d{2})')
+LAST_TIME_PATTERN = re.compile(r'(\d{1,2}:\d{2})\s*$')
 
 def convert_to_24hour(time_str, period):
     """Convert 12-hour time to 24-hour format"""
@@ -26,8 +53,7 @@ def is_time_cell(cell_value):
         return False
     cell_str = str(cell_value).strip()
     # Match patterns like "8:00-9:20", "8:00 - 9:20", "10:45 AM - 12:25 PM"
-    time_pattern = r'\d{1,2}:\d{2}\s*[-–]\s*\d{1,2}:\d{2}'
-    return bool(re.search(time_pattern, cell_str))
+    return bool(TIME_RANGE_PATTERN.search(cell_str))
 
 def is_day_name(cell_value):
     """Check if a cell contains a day name"""
@@ -37,26 +63,107 @@ def is_day_name(cell_value):
     days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
     return cell_str in days or isinstance(cell_value, datetime)
 
+class SheetGrid:
+    """
+    Dense snapshot of a worksheet with merged cells already resolved.
+
+    Every (row, col) maps to its resolved value (the anchor value for cells
+    inside a merged range) and, for merged cells, to the range bounds
+    (min_row, min_col, max_row, max_col). Built once per worksheet so cell
+    reads are O(1) instead of a scan over all merged ranges per lookup.
+    Rows and columns are 1-based, like openpyxl; reads outside the sheet
+    return None.
+    """
+
+    def __init__(self, title, rows, merged_ranges):
+        self.title = title
+        rows = [list(row) for row in rows]
+        merged_ranges = [tuple(bounds) for bounds in merged_ranges]
+
+        # Merged ranges may reach past the last populated row/column
+        self.max_row = max([len(rows)] + [bounds[2] for bounds in merged_ranges])
+        self.max_col = max([len(row) for row in rows] + [bounds[3] for bounds in merged_ranges] + [0])
+
+        rows.extend([] for _ in range(self.max_row - len(rows)))
+        for row in rows:
+            row.extend([None] * (self.max_col - len(row)))
+        self._values = rows
+
+        self._merged = {}
+        for bounds in merged_ranges:
+            min_row, min_col, max_row, max_col = bounds
+            anchor = rows[min_row - 1][min_col - 1]
+            for r in range(min_row, max_row + 1):
+                for c in range(min_col, max_col + 1):
+                    rows[r - 1][c - 1] = anchor
+                    self._merged[(r, c)] = bounds
+
+        self.merged_count = len(merged_ranges)
+
+    @classmethod
+    def from_worksheet(cls, ws):
+        """Snapshot an openpyxl worksheet"""
+        rows = ws.iter_rows(
+            min_row=1, min_col=1, max_row=ws.max_row, max_col=ws.max_column, values_only=True
+        )
+        merged_ranges = [
+            (merged.min_row, merged.min_col, merged.max_row, merged.max_col)
+            for merged in ws.merged_cells.ranges
+        ]
+        return cls(ws.title, rows, merged_ranges)
+
+    def value(self, row, col):
+        """Get cell value, handling merged cells"""
+        if 1 <= row <= self.max_row and 1 <= col <= self.max_col:
+            return self._values[row - 1][col - 1]
+        return None
+
+    def merged_range(self, row, col):
+        """Get (min_row, min_col, max_row, max_col) of the merged range holding a cell, or None"""
+        return self._merged.get((row, col))
+
+
+def load_sheet_grids(input_filename, reader="openpyxl"):
+    """
+    Load every worksheet of a workbook as a SheetGrid.
+
+    reader="openpyxl" uses load_workbook; reader="stream" reads values,
+    shared strings and merged ranges straight from the sheet XML (see
+    xlsx_stream), which is faster and far lighter on memory.
+    """
+    if reader == "stream":
+        import xlsx_stream
+
+        return [
+            SheetGrid(title, rows, merged_ranges)
+            for title, rows, merged_ranges in xlsx_stream.iter_sheets(input_filename)
+        ]
+    if reader != "openpyxl":
+        raise ValueError(f"Unknown workbook reader: {reader}")
+
+    # Imported here so the web app can use the parsing helpers without openpyxl
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filename=input_filename)
+    grids = [SheetGrid.from_worksheet(ws) for ws in wb.worksheets]
+    wb.close()
+    return grids
+
+
 def detect_day_blocks(ws):
     """
     Automatically detect day blocks in a worksheet.
+    Accepts an openpyxl worksheet or a SheetGrid.
     Returns a list of dictionaries with day_cell, time_row, room_rows, and time_cols.
     """
+    grid = ws if isinstance(ws, SheetGrid) else SheetGrid.from_worksheet(ws)
+    get_cell_value = grid.value
+
     blocks = []
-    merged_cells = ws.merged_cells.ranges
     processed_rows = set()  # Track which rows we've already processed as day blocks
 
-    def get_cell_value(row, col):
-        """Get cell value, handling merged cells"""
-        cell = ws.cell(row=row, column=col)
-        coord = f"{get_column_letter(col)}{row}"
-        for merged in merged_cells:
-            if coord in merged:
-                return ws.cell(merged.min_row, merged.min_col).value
-        return cell.value
-
     # Search for day cells in column B (column 2)
-    max_row = ws.max_row
+    max_row = grid.max_row
     for row in range(1, max_row + 1):
         if row in processed_rows:
             continue
@@ -166,7 +273,531 @@ def detect_day_blocks(ws):
 
     return blocks
 
-def convert_xlsx_to_csv(input_filename, output_filename=None):
+
+def fix_teacher_name_format(teacher_name):
+    """Fix spacing issues in teacher names, especially with titles"""
+    if not teacher_name:
+        return teacher_name
+
+    # Fix titles that are missing space after the period
+    # Handles: Mr., Ms., Mrs., Dr., Prof., Sir, Madam, etc.
+    # Pattern: Title followed by period with no space or directly followed by a capital letter
+    teacher_name = TITLE_DOT_PATTERN.sub(r'\1. \2', teacher_name)
+
+    # Also handle cases where there's no period but title is directly attached
+    # e.g., "MrNajaf" -> "Mr. Najaf"
+    teacher_name = TITLE_ATTACHED_PATTERN.sub(r'\1. \2', teacher_name)
+
+    # Normalize multiple spaces to single space
+    teacher_name = WHITESPACE_PATTERN.sub(' ', teacher_name)
+
+    return teacher_name.strip()
+
+
+def fix_class_group_format(class_group_str):
+    if not class_group_str:
+        return class_group_str
+
+    # Format 1: BSDS/BSAI-6A → BSDS-6A & BSAI-6A
+    class_group_str = SHARED_SECTION_PATTERN.sub(r'\1-\3 & \2-\3', class_group_str)
+
+    # Format 2: BSAI-1A/BSDS-1A → BSAI-1A & BSDS-1A
+    class_group_str = SLASHED_GROUPS_PATTERN.sub(r'\1 & \2', class_group_str)
+
+    # Format 3: BSSE-2A,2B,2C,2D,2E → BSSE-2A & BSSE-2B & BSSE-2C & BSSE-2D & BSSE-2E
+    class_group_str = COMMA_GROUPS_PATTERN.sub(r'\1 & \2', class_group_str)
+
+    return class_group_str
+
+
+def fix_time_format(time_str):
+    if not time_str:
+        return time_str
+    # Replace tabs with a dash if they appear between times
+    # Pattern: "HH:MM<tab>HH:MM" -> "HH:MM - HH:MM"
+    time_str = TAB_SEPARATED_TIMES_PATTERN.sub(r'\1 - \2', time_str)
+    # Replace remaining tabs with spaces
+    time_str = time_str.replace('\t', ' ')
+    # Replace various dash types (en-dash, em-dash, hyphen) with standard hyphen
+    time_str = time_str.replace('–', '-').replace('—', '-')
+    # Normalize all time ranges to have exactly one space before and after the dash
+    return DASH_PATTERN.sub(' - ', time_str.strip())
+
+
+# Structured result of parsing one timetable cell
+ParsedCell = namedtuple("ParsedCell", ["subject", "groups", "teachers", "timeslot"])
+
+
+class CellTextParser:
+    """
+    Parser for the multi-line text of a timetable cell, e.g.
+    "Subject\\nBSSE-4C\\nMr. X (10:45 AM TO 12:25 PM)".
+
+    Patterns are compiled once and results are memoized on the raw cell
+    string, so text repeated across days and rooms is parsed only once.
+    """
+
+    SKIPPED_SUBJECTS = ("used in cs department", "namaz break")
+    GROUP_PATTERN = re.compile(r'\b(BS\w{2,4})[-/]\d+[A-Za-z]*')
+    TIMESLOT_LINE_PATTERN = re.compile(r'^\s*\(([^)]+)\)\s*$')
+    TEACHER_TIMESLOT_PATTERN = re.compile(r"(.*?)\s*\(([^)]+)\)\s*$")
+    TIMESLOT_PATTERN = re.compile(
+        r'(\d{1,2}:\d{2})\s*(AM|PM)?\s*(?:-|TO|to)\s*(\d{1,2}:\d{2})\s*(AM|PM)?', re.IGNORECASE
+    )
+
+    def __init__(self, cache_size=4096):
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def parse_timeslot(self, timeslot_text):
+        """Extract a "HH:MM - HH:MM" range from timeslot text, converting AM/PM to 24-hour"""
+        time_match = self.TIMESLOT_PATTERN.search(timeslot_text)
+        if not time_match:
+            return None
+
+        start_time, start_period, end_time, end_period = time_match.groups()
+        # Convert to 24-hour format if AM/PM is present
+        if start_period:
+            start_time = convert_to_24hour(start_time, start_period)
+        if end_period:
+            end_time = convert_to_24hour(end_time, end_period)
+        return f"{start_time} - {end_time}"
+
+    def _parse(self, text):
+        """Parse cell text into a ParsedCell, or None if the cell holds no class"""
+        # Handle multi-line and complex cell content
+        lines = [line.strip() for line in text.strip().split("\n") if line.strip()]
+
+        # Skip if no valid lines
+        if not lines:
+            return None
+
+        # Skip unwanted entries
+        if lines[0].lower() in self.SKIPPED_SUBJECTS:
+            return None
+
+        subject = lines[0]
+        groups = []
+        teachers = []
+        timeslot = None
+
+        for line in lines[1:]:
+            # Detect group identifiers
+            if self.GROUP_PATTERN.search(line):
+                # Convert "BSDS/BSAI-6A" to "BSDS-6A & BSAI-6A"
+                groups.append(fix_class_group_format(line))
+                continue
+
+            # Check if this line is just a time slot in parentheses (e.g., "(10:45 am to 12:25 pm)")
+            timeslot_match = self.TIMESLOT_LINE_PATTERN.match(line)
+            if timeslot_match:
+                timeslot = self.parse_timeslot(timeslot_match.group(1).strip()) or timeslot
+                continue
+
+            # Detect teacher and timeslot on same line (e.g., "Ms. Namra Amjad (10:45 AM TO 12:25 PM)")
+            match = self.TEACHER_TIMESLOT_PATTERN.match(line)
+            if match:
+                timeslot = self.parse_timeslot(match.group(2).strip()) or timeslot
+                teachers.append(match.group(1).strip())
+            else:
+                # Consider it part of teacher names if not matched with timeslot
+                teachers.append(line)
+
+        full_groups = " & ".join(groups)
+        full_teachers = " ".join([t.strip().strip(",") for t in ", ".join(teachers).split(",") if t.strip()])
+
+        return ParsedCell(
+            subject=subject,
+            groups=fix_class_group_format(full_groups),
+            # Fix teacher name formatting (add space after titles like Mr., Ms., etc.)
+            teachers=fix_teacher_name_format(full_teachers),
+            timeslot=timeslot,
+        )
+
+
+cell_parser = CellTextParser()
+
+
+def extract_block_rows(grid, block, stats=None):
+    """
+    Extract the timetable rows of one day block from its worksheet grid.
+    If a stats dict is given, its "cells_scanned" and "rows_skipped"
+    counters are incremented.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("cells_scanned", 0)
+    stats.setdefault("rows_skipped", 0)
+    rows = []
+    get_cell_value = grid.value
+
+    raw_day = get_cell_value(block["day_row"], 2)  # Column B = 2
+    if isinstance(raw_day, datetime):
+        day = raw_day.strftime("%A")
+    else:
+        day = str(raw_day).strip() if raw_day else "Unknown"
+
+    time_row = block["time_row"]
+    room_rows = block["room_rows"]
+    time_cols = block["time_cols"]
+
+    # Get all time slots for this block
+    def clean_time_value(val):
+        """Clean time value by removing tabs and normalizing dashes"""
+        if not val:
+            return ""
+        time_str = str(val).strip()
+        # Replace tabs with spaces
+        time_str = time_str.replace('\t', ' ')
+        # Replace various dash types with standard hyphen
+        time_str = time_str.replace('–', '-').replace('—', '-')
+        # Normalize spaces around dash
+        time_str = DASH_PATTERN.sub(' - ', time_str)
+        return time_str
+
+    time_slots = {col: clean_time_value(get_cell_value(time_row, col)) for col in time_cols}
+
+    def get_merged_time_range(row, col):
+        """Get the time range for a cell, considering if it's merged across multiple time columns"""
+        # Check if this cell is part of a merged range
+        merged = grid.merged_range(row, col)
+        if merged:
+            # Get the start and end columns of the merged range
+            start_col = merged[1]
+            end_col = merged[3]
+
+            # Find the time columns that overlap with this merged range
+            overlapping_time_cols = [tc for tc in time_cols if start_col <= tc <= end_col]
+
+            if len(overlapping_time_cols) >= 2:
+                # Get start time from first column and end time from last column
+                first_time_col = overlapping_time_cols[0]
+                last_time_col = overlapping_time_cols[-1]
+
+                first_time_str = time_slots.get(first_time_col, "")
+                last_time_str = time_slots.get(last_time_col, "")
+
+                # Extract start time from first slot and end time from last slot
+                first_match = FIRST_TIME_PATTERN.search(first_time_str)
+                last_match = LAST_TIME_PATTERN.search(last_time_str)
+
+                if first_match and last_match:
+                    start_time = first_match.group(1)
+                    end_time = last_match.group(1)
+                    return f"{start_time} - {end_time}"
+            elif len(overlapping_time_cols) == 1:
+                # Only one time column, use its time
+                return time_slots.get(overlapping_time_cols[0], "")
+            else:
+                # No overlapping time columns found, return empty string
+                return ""
+
+        # Not merged, return the time for this column
+        return time_slots.get(col, "")
+
+    # Track which cells we've already processed (to avoid duplicates from merged cells)
+    processed_cells = set()
+
+    # Loop through each row (i.e., room) and each time slot
+    for r in room_rows:
+        room = get_cell_value(r, 2)  # Column B = 2 (Rooms)
+        for c in time_cols:
+            # Skip if we've already processed this cell (part of a merged range)
+            if (r, c) in processed_cells:
+                continue
+
+            stats["cells_scanned"] += 1
+            val = get_cell_value(r, c)
+            if not val:
+                continue
+
+            # Mark this cell and any merged cells as processed
+            merged = grid.merged_range(r, c)
+            if merged:
+                # Mark all cells in this merged range as processed
+                for mr in range(merged[0], merged[2] + 1):
+                    for mc in range(merged[1], merged[3] + 1):
+                        if mc in time_cols:  # Only mark time columns
+                            processed_cells.add((mr, mc))
+            else:
+                # Not merged, just mark this cell
+                processed_cells.add((r, c))
+
+            # Parse the cell text (memoized: the same text repeats across days and rooms)
+            parsed = cell_parser.parse(str(val))
+            if parsed is None:
+                stats["rows_skipped"] += 1
+                continue
+
+            # If a timeslot was detected in the teacher's name, use it
+            # Otherwise, get the time range considering merged cells
+            if parsed.timeslot:
+                time_for_this_class = parsed.timeslot
+            else:
+                time_for_this_class = get_merged_time_range(r, c)
+
+            # Append row with formatted data
+            rows.append({
+                "Day": day,
+                "Time": time_for_this_class,
+                "Room": str(room).strip(),
+                "Subject": parsed.subject,
+                "Class/Group": parsed.groups,
+                "Teacher(s) Name": parsed.teachers
+            })
+
+    return rows
+
+
+def convert_sheet(grid, sheet_index=0):
+    """
+    Detect the day blocks of one worksheet grid and extract their rows.
+    Top-level (and so picklable) so it can run in a worker process.
+
+    Returns:
+    tuple: (blocks, rows, stats) for this sheet, stats holding the
+           extraction counters (see extract_block_rows)
+    """
+    print(f"Detecting blocks in sheet {sheet_index + 1}: {grid.title}")
+    blocks = detect_day_blocks(grid)
+    print(f"  Found {len(blocks)} day block(s)")
+
+    rows = []
+    stats = {"cells_scanned": 0, "rows_skipped": 0}
+    for block in blocks:
+        block["sheet_index"] = sheet_index
+        try:
+            print(f"\nProcessing block: {block['day_name']}")
+            rows.extend(extract_block_rows(grid, block, stats))
+        except Exception as e:
+            print(f"Error processing block {block['day_name']}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            continue
+
+    return blocks, rows, stats
+
+
+def pool_size(workers, tasks):
+    """Worker processes to run tasks with: workers (0 or None for one per CPU), at most one per task"""
+    return max(min(workers or os.cpu_count() or 1, tasks), 1)
+
+
+def convert_grids(grids, workers=1):
+    """
+    Run convert_sheet over every grid, serially or in a process pool.
+    Results come back in sheet order either way.
+    """
+    max_workers = pool_size(workers, len(grids))
+    if max_workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(convert_sheet, grids, range(len(grids))))
+    return [convert_sheet(grid, sheet_index) for sheet_index, grid in enumerate(grids)]
+
+
+def read_and_convert_sheet(input_filename, sheet_index):
+    """
+    Read one worksheet with the streaming reader and run convert_sheet on
+    it, all in the calling (worker) process, so workbook parsing itself runs
+    in parallel and no grid is pickled between processes.
+
+    Returns:
+    tuple: (blocks, rows, stats, merged_count)
+    """
+    import xlsx_stream
+
+    grid = SheetGrid(*xlsx_stream.read_sheet(input_filename, sheet_index))
+    return convert_sheet(grid, sheet_index) + (grid.merged_count,)
+
+
+def convert_sheets_in_parallel(input_filename, max_workers):
+    """Read and convert every sheet of a workbook in a process pool, one sheet per task"""
+    import xlsx_stream
+    from concurrent.futures import ProcessPoolExecutor
+
+    sheets = xlsx_stream.sheet_count(input_filename)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_and_convert_sheet, [input_filename] * sheets, range(sheets)))
+
+
+def workbook_cache_key(input_filename):
+    """Content hash of a workbook, salted with CONVERTER_VERSION"""
+    digest = hashlib.sha256(f"converter-{CONVERTER_VERSION}:".encode())
+    with open(input_filename, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cached_rows(cache_dir, key):
+    """Return the cached rows for a workbook key, or None on a miss"""
+    cache_file = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if cached.get("version") != CONVERTER_VERSION:
+        return None
+    return cached["rows"]
+
+
+def store_cached_rows(cache_dir, key, rows, source=None):
+    """Store extracted rows under a workbook key, keeping only the newest entries"""
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = os.path.join(cache_dir, f"{key}.json")
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump({"version": CONVERTER_VERSION, "source": source, "rows": rows}, file)
+    os.replace(tmp_file, cache_file)
+
+    # Drop the oldest entries beyond the cache limit
+    entries = sorted(
+        (entry for entry in os.scandir(cache_dir) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in entries[CACHE_MAX_ENTRIES:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+class ConversionReport:
+    """
+    Structured report of one conversion: wall and CPU time per phase plus
+    counters (sheets, blocks, cells scanned, merged ranges, rows emitted
+    and skipped). CPU time is this process's only.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.reader = None
+        self.workers = None
+        self.cache_hit = False
+        self.cache_key = None
+        self.started_at = time.time()
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase; repeated phases accumulate"""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            timing["wall"] += time.perf_counter() - wall_start
+            timing["cpu"] += time.process_time() - cpu_start
+
+    def as_dict(self):
+        """JSON-serializable form of the report"""
+        return {
+            "source": self.source,
+            "reader": self.reader,
+            "workers": self.workers,
+            "cache_hit": self.cache_hit,
+            "cache_key": self.cache_key,
+            "started_at": self.started_at,
+            "total_wall": round(sum(timing["wall"] for timing in self.phases.values()), 6),
+            "phases": {
+                name: {"wall": round(timing["wall"], 6), "cpu": round(timing["cpu"], 6)}
+                for name, timing in self.phases.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def summary(self):
+        """One-line summary for logs"""
+        phases = ", ".join(f"{name} {timing['wall']:.3f}s" for name, timing in self.phases.items())
+        counters = ", ".join(f"{name}={value}" for name, value in self.counters.items())
+        cache = " (cache hit)" if self.cache_hit else ""
+        return f"Conversion of {self.source}{cache}: {phases}; {counters}"
+
+
+def extract_timetable_rows(input_filename, reader="openpyxl", workers=1, cache_dir=None, report=None):
+    """
+    Extract the timetable rows (dicts keyed by CSV_COLUMNS) from a workbook.
+
+    When cache_dir is given, rows are cached under workbook_cache_key, so an
+    identical workbook is only hashed, not parsed, on later calls.
+    If a ConversionReport is given, phase timings and counters are recorded in it.
+    See convert_xlsx_to_csv for reader and workers.
+    """
+    if report is None:
+        report = ConversionReport(input_filename)
+    report.reader = reader
+    report.workers = workers
+
+    if cache_dir:
+        with report.phase("hash"):
+            key = workbook_cache_key(input_filename)
+            rows = load_cached_rows(cache_dir, key)
+        report.cache_key = key
+        if rows is not None:
+            print(f"Using cached conversion of {input_filename}")
+            report.cache_hit = True
+            report.counters["rows_emitted"] = len(rows)
+            return rows
+
+    max_workers = 1
+    if reader == "stream" and workers != 1:
+        import xlsx_stream
+
+        max_workers = pool_size(workers, xlsx_stream.sheet_count(input_filename))
+
+    if max_workers > 1:
+        # Each worker process reads and converts its own sheets; CPU time of
+        # the workers is not included in this phase's cpu figure
+        with report.phase("load_extract"):
+            sheet_results = convert_sheets_in_parallel(input_filename, max_workers)
+        report.counters["sheets"] = len(sheet_results)
+        report.counters["merged_ranges"] = sum(merged_count for *_, merged_count in sheet_results)
+        sheet_results = [result[:3] for result in sheet_results]
+    else:
+        # Load every worksheet as a grid snapshot; all cell reads below go through the grids
+        with report.phase("load"):
+            grids = load_sheet_grids(input_filename, reader)
+        report.counters["sheets"] = len(grids)
+        report.counters["merged_ranges"] = sum(grid.merged_count for grid in grids)
+
+        # With openpyxl the workbook can only be loaded as a whole, so only
+        # detection and extraction run in the pool
+        with report.phase("extract"):
+            sheet_results = convert_grids(grids, workers)
+
+    all_day_blocks = [block for blocks, _, _ in sheet_results for block in blocks]
+    print(f"\nTotal blocks detected across all sheets: {len(all_day_blocks)}")
+
+    if not all_day_blocks:
+        print("Warning: No day blocks detected in the workbook!")
+
+    rows = [row for _, sheet_rows, _ in sheet_results for row in sheet_rows]
+    report.counters["blocks"] = len(all_day_blocks)
+    for _, _, stats in sheet_results:
+        for name, value in stats.items():
+            report.counters[name] = report.counters.get(name, 0) + value
+    report.counters["rows_emitted"] = len(rows)
+
+    # Apply fixes
+    with report.phase("fixes"):
+        for row in rows:
+            row["Time"] = fix_time_format(row["Time"])
+            row["Class/Group"] = fix_class_group_format(row["Class/Group"])
+
+    if cache_dir:
+        with report.phase("cache_store"):
+            store_cached_rows(cache_dir, key, rows, source=os.path.basename(input_filename))
+
+    return rows
+
+
+def convert_xlsx_to_csv(input_filename, output_filename=None, reader="openpyxl", workers=1, cache_dir=None,
+                        with_report=False):
     """
     Convert Excel timetable to CSV format with automatic detection of day blocks.
 
@@ -174,9 +805,19 @@ def convert_xlsx_to_csv(input_filename, output_filename=None):
     input_filename (str): Path to the input XLSX file
     output_filename (str, optional): Path to the output CSV file. If None,
                                     will use input filename with .csv extension
+    reader (str, optional): Workbook reader, "openpyxl" (default) or "stream"
+    workers (int, optional): Number of worker processes. 1 (default) converts
+                             sheets serially; more runs each sheet in its own
+                             process, 0 or None uses one per CPU. With the
+                             stream reader each worker also reads its own
+                             sheets from the file. The CSV is identical
+                             either way.
+    cache_dir (str, optional): Directory of the content-addressed conversion
+                               cache. If None, the workbook is always parsed.
+    with_report (bool, optional): Also return the ConversionReport
 
     Returns:
-    str: Path to the created CSV file
+    str: Path to the created CSV file, or (path, ConversionReport) if with_report
     """
     # If output_filename not provided, derive from input_filename
     if output_filename is None:
@@ -187,334 +828,204 @@ def convert_xlsx_to_csv(input_filename, output_filename=None):
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
-    # Load workbook and get all worksheets
-    wb = load_workbook(filename=input_filename)
-    worksheets = wb.worksheets
-
-    # Automatically detect day blocks from all worksheets
-    all_day_blocks = []
-    for sheet_index, ws in enumerate(worksheets):
-        print(f"Detecting blocks in sheet {sheet_index + 1}: {ws.title}")
-        blocks = detect_day_blocks(ws)
-        for block in blocks:
-            block["sheet_index"] = sheet_index
-            all_day_blocks.append(block)
-        print(f"  Found {len(blocks)} day block(s)")
+    report = ConversionReport(input_filename)
+    rows = extract_timetable_rows(input_filename, reader, workers, cache_dir, report)
 
-    print(f"\nTotal blocks detected across all sheets: {len(all_day_blocks)}")
+    # Output
+    with report.phase("write"):
+        write_rows_csv(rows, output_filename)
+    print(f"Converted {input_filename} to {output_filename}")
 
-    if not all_day_blocks:
-        print("Warning: No day blocks detected in the workbook!")
-        # Create empty CSV
-        df = pd.DataFrame(columns=["Day", "Time", "Room", "Subject", "Class/Group", "Teacher(s) Name"])
-        df.to_csv(output_filename, index=False)
-        return output_filename
-
-    def fix_teacher_name_format(teacher_name):
-        """Fix spacing issues in teacher names, especially with titles"""
-        if not teacher_name:
-            return teacher_name
-
-        # Fix titles that are missing space after the period
-        # Handles: Mr., Ms., Mrs., Dr., Prof., Sir, Madam, etc.
-        # Pattern: Title followed by period with no space or directly followed by a capital letter
-        teacher_name = re.sub(
-            r'\b(Mr|Ms|Mrs|Dr|Prof|Sir|Madam)\.([A-Z])',
-            r'\1. \2',
-            teacher_name,
-            flags=re.IGNORECASE
-        )
+    if with_report:
+        return output_filename, report
+    return output_filename
 
-        # Also handle cases where there's no period but title is directly attached
-        # e.g., "MrNajaf" -> "Mr. Najaf"
-        teacher_name = re.sub(
-            r'\b(Mr|Ms|Mrs|Dr|Prof)([A-Z][a-z])',
-            r'\1. \2',
-            teacher_name
-        )
 
-        # Normalize multiple spaces to single space
-        teacher_name = re.sub(r'\s+', ' ', teacher_name)
+# Typed timetable record handed from the converter to the app's ingest:
+# times split into "HH:MM" strings and minute offsets, groups expanded and
+# teachers split into upper-cased names
+TimetableRecord = namedtuple(
+    "TimetableRecord",
+    ["day", "start_time", "end_time", "start_minutes", "end_minutes", "room", "subject", "groups", "teachers"],
+)
 
-        return teacher_name.strip()
+# Valid teacher name prefixes in hierarchical order
+PREFIX_HIERARCHY = ["Ms", "Mrs", "Miss", "Ma'am", "Maam", "Mr", "Sir", "Dr", "Prof"]
 
-    def fix_class_group_format(class_group_str):
-        if not class_group_str:
-            return class_group_str
 
-        # Format 1: BSDS/BSAI-6A → BSDS-6A & BSAI-6A
-        class_group_str = re.sub(
-            r'\b([A-Z]{4})/([A-Z]{4})-(\d+[A-Za-z]*)\b',
-            r'\1-\3 & \2-\3',
-            class_group_str
-        )
+def parse_multiple_teachers(teachers_str):
+    """Parse multiple teachers from a string like 'Mr. John Mr. Jane Dr. Smith'"""
+    teachers_str = teachers_str.strip()
+    if not teachers_str:
+        return []
 
-        # Format 2: BSAI-1A/BSDS-1A → BSAI-1A & BSDS-1A
-        class_group_str = re.sub(
-            r'\b([A-Z]{4}-\d+[A-Za-z]*)/([A-Z]{4}-\d+[A-Za-z]*)\b',
-            r'\1 & \2',
-            class_group_str
-        )
+    teachers = []
+    current_teacher = ""
+    words = teachers_str.split()
+
+    for word in words:
+        # Check if this word is a prefix (start of new teacher name)
+        if any(word.upper().startswith(prefix.upper()) for prefix in PREFIX_HIERARCHY):
+            # If we have a current teacher, add it to the list
+            if current_teacher.strip():
+                teachers.append(current_teacher.strip().upper())
+            # Start new teacher name
+            current_teacher = word
+        else:
+            # Continue building current teacher name
+            current_teacher += " " + word
 
-        # Format 3: BSSE-2A,2B,2C,2D,2E → BSSE-2A & BSSE-2B & BSSE-2C & BSSE-2D & BSSE-2E
-        class_group_str = re.sub(
-            r'([A-Z]{4}-\d+[A-Za-z]*)[,]([A-Z]{4}-\d+[A-Za-z]*)',
-            r'\1 & \2',
-            class_group_str
-        )
+    # Add the last teacher
+    if current_teacher.strip():
+        teachers.append(current_teacher.strip().upper())
 
-        return class_group_str
+    return teachers
 
 
-    def get_cell_value(row, col):
-        cell = ws.cell(row=row, column=col)
-        coord = f"{get_column_letter(col)}{row}"
-        for merged in merged_cells:
-            if coord in merged:
-                return ws.cell(merged.min_row, merged.min_col).value
-        return cell.value
+def parse_groups(group_string):
+    """Parse group string and return list of individual groups"""
+    if not group_string or group_string.strip() == "":
+        return []
 
-    # Extract structured timetable
-    rows = []
+    # Clean the string
+    group_string = group_string.strip()
 
-    for block in all_day_blocks:
-        try:
-            print(f"\nProcessing block: {block['day_name']}")
-            # Get the appropriate worksheet
-            ws = worksheets[block["sheet_index"]]
-
-            # Get merged cells for this worksheet
-            merged_cells = ws.merged_cells.ranges
-
-            # Update get_cell_value to use current worksheet
-            def get_cell_value(row, col):
-                cell = ws.cell(row=row, column=col)
-                coord = f"{get_column_letter(col)}{row}"
-                for merged in merged_cells:
-                    if coord in merged:
-                        return ws.cell(merged.min_row, merged.min_col).value
-                return cell.value
-
-            raw_day = get_cell_value(block["day_row"], 2)  # Column B = 2
-            if isinstance(raw_day, datetime):
-                day = raw_day.strftime("%A")
-            else:
-                day = str(raw_day).strip() if raw_day else "Unknown"
-
-            time_row = block["time_row"]
-            room_rows = block["room_rows"]
-            time_cols = block["time_cols"]
-
-            # Get all time slots for this block
-            def clean_time_value(val):
-                """Clean time value by removing tabs and normalizing dashes"""
-                if not val:
-                    return ""
-                time_str = str(val).strip()
-                # Replace tabs with spaces
-                time_str = time_str.replace('\t', ' ')
-                # Replace various dash types with standard hyphen
-                time_str = time_str.replace('–', '-').replace('—', '-')
-                # Normalize spaces around dash
-                time_str = re.sub(r'\s*-\s*', ' - ', time_str)
-                return time_str
-
-            time_slots = {col: clean_time_value(get_cell_value(time_row, col)) for col in time_cols}
-
-            def get_merged_time_range(row, col):
-                """Get the time range for a cell, considering if it's merged across multiple time columns"""
-                coord = f"{get_column_letter(col)}{row}"
-
-                # Check if this cell is part of a merged range
-                for merged in merged_cells:
-                    if coord in merged:
-                        # Get the start and end columns of the merged range
-                        start_col = merged.min_col
-                        end_col = merged.max_col
-
-                        # Find the time columns that overlap with this merged range
-                        overlapping_time_cols = [tc for tc in time_cols if start_col <= tc <= end_col]
-
-                        if len(overlapping_time_cols) >= 2:
-                            # Get start time from first column and end time from last column
-                            first_time_col = overlapping_time_cols[0]
-                            last_time_col = overlapping_time_cols[-1]
-
-                            first_time_str = time_slots.get(first_time_col, "")
-                            last_time_str = time_slots.get(last_time_col, "")
-
-                            # Extract start time from first slot and end time from last slot
-                            first_match = re.search(r'(\d{1,2}:\d{2})', first_time_str)
-                            last_match = re.search(r'(\d{1,2}:\d{2})\s*$', last_time_str)
-
-                            if first_match and last_match:
-                                start_time = first_match.group(1)
-                                end_time = last_match.group(1)
-                                return f"{start_time} - {end_time}"
-                        elif len(overlapping_time_cols) == 1:
-                            # Only one time column, use its time
-                            return time_slots.get(overlapping_time_cols[0], "")
-                        else:
-                            # No overlapping time columns found, return empty string
-                            return ""
-
-                # Not merged, return the time for this column
-                return time_slots.get(col, "")
-
-            # Track which cells we've already processed (to avoid duplicates from merged cells)
-            processed_cells = set()
-
-            # Loop through each row (i.e., room) and each time slot
-            for r in room_rows:
-                room = get_cell_value(r, 2)  # Column B = 2 (Rooms)
-                for c in time_cols:
-                    coord = f"{get_column_letter(c)}{r}"
-
-                    # Skip if we've already processed this cell (part of a merged range)
-                    if coord in processed_cells:
-                        continue
-
-                    val = get_cell_value(r, c)
-                    if not val:
-                        continue
-
-                    # Mark this cell and any merged cells as processed
-                    for merged in merged_cells:
-                        if coord in merged:
-                            # Mark all cells in this merged range as processed
-                            for mr in range(merged.min_row, merged.max_row + 1):
-                                for mc in range(merged.min_col, merged.max_col + 1):
-                                    if mc in time_cols:  # Only mark time columns
-                                        processed_cells.add(f"{get_column_letter(mc)}{mr}")
-                            break
-                    else:
-                        # Not merged, just mark this cell
-                        processed_cells.add(coord)
-
-                    # Handle multi-line and complex cell content
-                    lines = [line.strip() for line in str(val).strip().split("\n") if line.strip()]
-
-                    # Skip if no valid lines
-                    if not lines:
-                        continue
-
-                    # Skip unwanted entries
-                    if lines[0].lower() in ["used in cs department", "namaz break"]:
-                        continue
-
-                    subject = lines[0]
-                    groups = []
-                    teachers = []
-                    teacher_timeslot = None
-
-                    for line in lines[1:]:
-                        # Detect group identifiers
-                        if re.search(r'\b(BS\w{2,4})[-/]\d+[A-Za-z]*', line):
-                            # Convert "BSDS/BSAI-6A" to "BSDS-6A & BSAI-6A"
-                            line = fix_class_group_format(line)
-                            groups.append(line)
-                        # Check if this line is just a time slot in parentheses (e.g., "(10:45 am to 12:25 pm)")
-                        elif re.match(r'^\s*\(([^)]+)\)\s*$', line):
-                            timeslot_text = re.match(r'^\s*\(([^)]+)\)\s*$', line).group(1).strip()
-
-                            # Extract time from various formats and convert to 24-hour
-                            time_match = re.search(r'(\d{1,2}:\d{2})\s*(AM|PM)?\s*(?:-|TO|to)\s*(\d{1,2}:\d{2})\s*(AM|PM)?', timeslot_text, re.IGNORECASE)
-                            if time_match:
-                                start_time = time_match.group(1)
-                                start_period = time_match.group(2)
-                                end_time = time_match.group(3)
-                                end_period = time_match.group(4)
-
-                                # Convert to 24-hour format if AM/PM is present
-                                if start_period:
-                                    start_time = convert_to_24hour(start_time, start_period)
-                                if end_period:
-                                    end_time = convert_to_24hour(end_time, end_period)
-
-                            teacher_timeslot = f"{start_time} - {end_time}"
-                        else:
-                            # Detect teacher and timeslot on same line (e.g., "Ms. Namra Amjad (10:45 AM TO 12:25 PM)")
-                            match = re.match(r"(.*?)\s*\(([^)]+)\)\s*$", line)
-                            if match:
-                                teacher_name = match.group(1).strip()
-                                timeslot_text = match.group(2).strip()
-
-                                # Extract time from various formats and convert to 24-hour
-                                time_match = re.search(r'(\d{1,2}:\d{2})\s*(AM|PM)?\s*(?:-|TO|to)\s*(\d{1,2}:\d{2})\s*(AM|PM)?', timeslot_text, re.IGNORECASE)
-                                if time_match:
-                                    start_time = time_match.group(1)
-                                    start_period = time_match.group(2)
-                                    end_time = time_match.group(3)
-                                    end_period = time_match.group(4)
-
-                                    # Convert to 24-hour format if AM/PM is present
-                                    if start_period:
-                                        start_time = convert_to_24hour(start_time, start_period)
-                                    if end_period:
-                                        end_time = convert_to_24hour(end_time, end_period)
-
-                                    teacher_timeslot = f"{start_time} - {end_time}"
-
-                                teachers.append(teacher_name)
-                            else:
-                                # Consider it part of teacher names if not matched with timeslot
-                                teachers.append(line)
-
-                    # If a timeslot was detected in the teacher's name, use it
-                    # Otherwise, get the time range considering merged cells
-                    if teacher_timeslot:
-                        time_for_this_class = teacher_timeslot
-                    else:
-                        time_for_this_class = get_merged_time_range(r, c)
-
-                    # Apply fix_class_group_format to the entire group string
-                    full_groups = " & ".join(groups)  # Now this will have the proper format
-                    full_teachers = " ".join([t.strip().strip(",") for t in ", ".join(teachers).split(",") if t.strip()])
-
-                    # Fix teacher name formatting (add space after titles like Mr., Ms., etc.)
-                    full_teachers = fix_teacher_name_format(full_teachers)
-
-                    # Append row with formatted data
-                    rows.append({
-                        "Day": day,
-                        "Time": time_for_this_class,
-                        "Room": str(room).strip(),
-                        "Subject": subject,
-                        "Class/Group": fix_class_group_format(full_groups),  # Apply here
-                        "Teacher(s) Name": full_teachers
-                    })
+    # Split by & and clean each part
+    parts = [part.strip() for part in group_string.split("&")]
+    groups = []
+    current_prefix = ""
 
-        except Exception as e:
-            print(f"Error processing block {block['day_name']}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+    for part in parts:
+        # If part contains a dash, it's a full group name
+        if "-" in part:
+            groups.append(part)
+            # Extract prefix for next iterations (e.g., "BSSE" from "BSSE-5A")
+            current_prefix = part.split("-")[0]
+        else:
+            # It's just a number/suffix, use the current prefix
+            if current_prefix and part:
+                groups.append(f"{current_prefix}-{part}")
+            elif part:
+                # If no current prefix, this might be a standalone group
+                groups.append(part)
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_groups = []
+    for group in groups:
+        if group and group not in seen:
+            seen.add(group)
+            unique_groups.append(group)
+
+    return unique_groups
+
+
+def normalize_time(time_str):
+    """Normalize time format for comparison"""
+    time_str = time_str.strip()
+    # Handle times like "01:30" vs "1:30"
+    if ":" in time_str:
+        parts = time_str.split(":")
+        hour = parts[0].zfill(2)  # Pad with leading zero if needed
+        minute = parts[1]
+        return f"{hour}:{minute}"
+    return time_str
+
+
+def clock_to_minutes(time_str):
+    """Convert a timetable clock time to minutes for proper sorting"""
+    time_str = normalize_time(time_str)
+    if ":" in time_str:
+        hour, minute = time_str.split(":")
+        hour = int(hour)
+        minute = int(minute)
+
+        # Handle 12-hour format without AM/PM indicators
+        # Assume times 1-7 are PM (13-19), times 8-12 are AM (8-12)
+        if hour >= 1 and hour <= 7:
+            hour += 12  # Convert to 24-hour format
+
+        return hour * 60 + minute
+    return 0
+
+
+def rows_to_records(rows):
+    """
+    Turn timetable rows (dicts keyed by CSV_COLUMNS, as extracted or read
+    back from the CSV) into TimetableRecords, skipping rows without a class.
+    """
+    records = []
+    for row in rows:
+        day = (row.get("Day") or "").strip()
+        time = (row.get("Time") or "").strip()
+        room = (row.get("Room") or "").strip()
+        subject = (row.get("Subject") or "").strip()
+        group = (row.get("Class/Group") or "").strip()
+        teachers_str = (row.get("Teacher(s) Name") or "").strip()
+
+        # Skip empty rows or rows with F25 placeholder
+        if not subject or subject == "F25" or not teachers_str:
             continue
 
-    # Convert to DataFrame
-    df = pd.DataFrame(rows)
+        # Parse multiple teachers
+        teachers = parse_multiple_teachers(teachers_str)
+        if not teachers:
+            continue
 
-    def fix_time_format(time_str):
-        if not time_str:
-            return time_str
-        # Replace tabs with a dash if they appear between times
-        # Pattern: "HH:MM<tab>HH:MM" -> "HH:MM - HH:MM"
-        time_str = re.sub(r'(\d{1,2}:\d{2})\s*\t\s*(\d{1,2}:\d{2})', r'\1 - \2', time_str)
-        # Replace remaining tabs with spaces
-        time_str = time_str.replace('\t', ' ')
-        # Replace various dash types (en-dash, em-dash, hyphen) with standard hyphen
-        time_str = time_str.replace('–', '-').replace('—', '-')
-        # Normalize all time ranges to have exactly one space before and after the dash
-        return re.sub(r'\s*-\s*', ' - ', time_str.strip())
+        # Extract start and end time
+        if "-" in time:
+            start_time, end_time = [t.strip() for t in time.split("-", 1)]
+        else:
+            start_time = end_time = time.strip()
+
+        records.append(TimetableRecord(
+            day=day,
+            start_time=start_time,
+            end_time=end_time,
+            start_minutes=clock_to_minutes(start_time),
+            end_minutes=clock_to_minutes(end_time),
+            room=room,
+            subject=subject,
+            groups=tuple(parse_groups(group)),
+            teachers=tuple(teachers),
+        ))
+    return records
+
+
+def write_rows_csv(rows, output_filename):
+    """Write timetable rows to a CSV file with the CSV_COLUMNS header"""
+    with open(output_filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS, lineterminator=os.linesep)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def extract_timetable_records(input_filename, reader="openpyxl", workers=1, cache_dir=None, csv_output=None,
+                              report=None):
+    """
+    Extract TimetableRecords from a workbook for direct ingest by the app.
 
-    # Apply fixes
-    df['Time'] = df['Time'].apply(fix_time_format)
-    df['Class/Group'] = df['Class/Group'].apply(fix_class_group_format)
+    csv_output (str, optional): Also write the rows to this CSV file.
+    report (ConversionReport, optional): Filled in with phase timings and counters.
+    See convert_xlsx_to_csv for the other parameters.
+    """
+    if report is None:
+        report = ConversionReport(input_filename)
+    rows = extract_timetable_rows(input_filename, reader, workers, cache_dir, report)
+
+    if csv_output:
+        with report.phase("write"):
+            output_dir = os.path.dirname(csv_output)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            write_rows_csv(rows, csv_output)
+        print(f"Converted {input_filename} to {csv_output}")
+
+    with report.phase("records"):
+        records = rows_to_records(rows)
+    report.counters["records"] = len(records)
+    return records
 
-    # Output
-    df.to_csv(output_filename, index=False)
-    print(f"Converted {input_filename} to {output_filename}")
-    
-    return output_filename
 
 def convert_to_24hour(time_str, period):
     """Convert 12-hour time to 24-hour format"""
@@ -563,7 +1074,24 @@ def time_to_minutes(time_str):
     hours, minutes = map(int, time_str.split(':'))
     return hours * 60 + minutes
 
-# If run directly, use the hardcoded filename
+# If run directly, convert the given workbook (the app runs this in a
+# subprocess to keep openpyxl's memory out of the web workers)
 if __name__ == "__main__":
-    input_file = 'Timetable SE Department (Fall-25) UpdatedVersion - 1.1.xlsx'
-    convert_xlsx_to_csv(input_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert an Excel timetable to CSV")
+    parser.add_argument("input_file", nargs="?", default='Timetable SE Department (Fall-25) UpdatedVersion - 1.1.xlsx')
+    parser.add_argument("--output", help="output CSV path (default: input name with .csv)")
+    parser.add_argument("--reader", default="openpyxl", choices=["openpyxl", "stream"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cache-dir", help="conversion cache directory")
+    parser.add_argument("--report", help="write the conversion report as JSON to this path")
+    args = parser.parse_args()
+
+    _, conversion_report = convert_xlsx_to_csv(
+        args.input_file, args.output, args.reader, args.workers, args.cache_dir, with_report=True
+    )
+    print(conversion_report.summary())
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(conversion_report.as_dict(), report_file)
@@ -0,0 +1,162 @@
+"""
+Compact timetable entries.
+
+A TimetableEntry is one class slot, shared by the timetables of all its
+teachers rather than copied per co-teacher. Entries use __slots__,
+intern their repeated strings (days, times, rooms, subjects, groups),
+keep start and end as integer minutes next to the display text, and
+refer to teachers by index into teacher_roster instead of each holding a
+joined name string. Entries of a timetable loaded from the shared
+snapshot file are snapshot_file.SnapshotEntry views with the same
+attributes, read from the mapped file.
+"""
+
+import sys
+
+DAY_ORDER = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+# Interned group and teacher id tuples, shared by every entry listing the same ones
+_shared_tuples = {}
+
+
+def intern_text(text):
+    """Return the interned copy of a string"""
+    return sys.intern(str(text))
+
+
+def intern_groups(groups):
+    """Return the shared tuple of interned group names"""
+    groups = tuple(intern_text(group) for group in groups)
+    return _shared_tuples.setdefault(groups, groups)
+
+
+def clock_sort_key(day, start_time):
+    """
+    Sort key of a slot as one integer: day order, then the start time's
+    digits read as a number (so "1:00" sorts before "8:00", as it always has)
+    """
+    # Get day index
+    day_index = DAY_ORDER.index(day) if day in DAY_ORDER else 999
+
+    # Convert time to comparable format (remove colons, pad with zeros)
+    time_parts = start_time.replace(":", "").strip()
+    time_num = int(time_parts) if time_parts.isdigit() else 0
+
+    return day_index * 10**9 + time_num
+
+
+class TeacherRoster:
+    """
+    Append-only table of teacher names. Entries hold indices into it, so
+    ids stay valid for entries carried over from earlier snapshots.
+    Only the ingest thread adds names.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+        self._displays = {}
+
+    def ids(self, names):
+        """Indices of names, adding the ones not seen yet"""
+        teacher_ids = []
+        for name in names:
+            teacher_id = self._ids.get(name)
+            if teacher_id is None:
+                teacher_id = self._ids[name] = len(self.names)
+                self.names.append(intern_text(name))
+            teacher_ids.append(teacher_id)
+        teacher_ids = tuple(teacher_ids)
+        return _shared_tuples.setdefault(teacher_ids, teacher_ids)
+
+    def display(self, teacher_ids):
+        """Comma-separated names of teacher_ids, built once per distinct set"""
+        text = self._displays.get(teacher_ids)
+        if text is None:
+            text = self._displays[teacher_ids] = ", ".join(self.names[i] for i in teacher_ids)
+        return text
+
+
+teacher_roster = TeacherRoster()
+
+
+class EntryFields:
+    """
+    Methods shared by every kind of entry; subclasses provide day,
+    start_time, end_time, start_minutes, end_minutes, location, subject,
+    groups, teacher_ids and sort_key.
+    """
+
+    __slots__ = ()
+
+    @property
+    def teachers(self):
+        """All teachers of the slot, comma-separated"""
+        return teacher_roster.display(self.teacher_ids)
+
+    @property
+    def teacher_names(self):
+        """The slot's teacher names"""
+        return tuple(teacher_roster.names[i] for i in self.teacher_ids)
+
+    def identity(self):
+        """Fields that make two entries the same class"""
+        return (
+            self.day,
+            self.start_time,
+            self.end_time,
+            self.location,
+            self.subject,
+            self.groups,
+            self.teacher_ids,
+        )
+
+    def as_dict(self):
+        """The entry in the JSON/export layout"""
+        return {
+            "day": self.day,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "location": self.location,
+            "subject": self.subject,
+            "groups": list(self.groups),
+            "teachers": self.teachers,
+        }
+
+
+class TimetableEntry(EntryFields):
+    """One class slot: when, where, what, for which groups and by which teachers"""
+
+    __slots__ = (
+        "day",
+        "start_time",
+        "end_time",
+        "start_minutes",
+        "end_minutes",
+        "location",
+        "subject",
+        "groups",
+        "teacher_ids",
+        "sort_key",
+    )
+
+    def __init__(self, day, start_time, end_time, start_minutes, end_minutes, location, subject, groups, teachers):
+        self.day = intern_text(day)
+        self.start_time = intern_text(start_time)
+        self.end_time = intern_text(end_time)
+        self.start_minutes = start_minutes
+        self.end_minutes = end_minutes
+        self.location = intern_text(location)
+        self.subject = intern_text(subject)
+        self.groups = intern_groups(groups)
+        self.teacher_ids = teacher_roster.ids(teachers)
+        self.sort_key = clock_sort_key(self.day, self.start_time)
+        teacher_roster.display(self.teacher_ids)
@@ -0,0 +1,220 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+import traceback
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# inotify event mask: files written, created, deleted or moved in/out
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class BackgroundThread:
+    """
+    Base for the app's background daemon threads. The thread is started
+    lazily and restarted after a fork (e.g. in gunicorn workers), since
+    threads do not survive fork.
+    """
+
+    name = "background"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """Start the thread if it is not running in this process"""
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class ProcessLock:
+    """
+    Exclusive lock on a file that at most one process holds at a time
+    (flock). The operating system releases it when the holder exits, so
+    another process can take over. Where flock is unavailable every
+    process gets the lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._pid = None
+
+    def acquire(self):
+        """Try to take the lock without blocking; returns whether this process holds it"""
+        if self._fd is not None and self._pid != os.getpid():
+            # Inherited across fork: the lock belongs to the parent
+            os.close(self._fd)
+            self._fd = None
+        if self._fd is not None or fcntl is None:
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd, self._pid = fd, os.getpid()
+        return True
+
+
+class BackgroundReloader(BackgroundThread):
+    """
+    Runs a reload function on a background daemon thread, off the request path.
+
+    Reload requests are coalesced: any number of request_reload() calls made
+    while a reload is running result in one more run.
+    """
+
+    name = "timetable-reloader"
+
+    def __init__(self, reload_fn):
+        super().__init__()
+        self._reload_fn = reload_fn
+        self._wakeup = threading.Event()
+        self._loaded = threading.Event()
+        self.last_error = None
+
+    def request_reload(self):
+        """Ask the worker to run a reload; returns immediately"""
+        self.start()
+        self._wakeup.set()
+
+    def wait_until_loaded(self, timeout=None):
+        """Block until the first reload has finished; returns False on timeout"""
+        return self._loaded.wait(timeout)
+
+    @property
+    def loaded(self):
+        """Whether at least one reload has finished (successfully or not)"""
+        return self._loaded.is_set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                self._reload_fn()
+                self.last_error = None
+            except Exception as e:
+                print(f"Error reloading timetable: {e}")
+                traceback.print_exc()
+                self.last_error = str(e)
+            finally:
+                self._loaded.set()
+
+
+def open_inotify(directories):
+    """Return an inotify file descriptor watching directories, or None where unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        for directory in directories:
+            if os.path.isdir(directory):
+                libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+        return fd
+    except (OSError, AttributeError) as e:
+        print(f"Warning: inotify unavailable, polling uploads instead: {e}")
+        return None
+
+
+class UploadWatcher(BackgroundThread):
+    """
+    Watches upload folders on a background thread and calls on_change with
+    {path: (mtime, size)} of the matching files whenever that set changes
+    (and once after the first scan).
+
+    Folders are rescanned every `interval` seconds; where inotify is
+    available it wakes the scan as soon as a file is written, so the
+    interval only bounds how stale a missed event can leave the state.
+    """
+
+    name = "upload-watcher"
+
+    def __init__(self, folders, on_change, interval=5.0, use_inotify=True, ignore=()):
+        super().__init__()
+        self.folders = folders  # {directory: file extension}
+        self.on_change = on_change
+        self.interval = interval
+        self.use_inotify = use_inotify
+        self.ignore = set(ignore)
+        self.files = None
+        self._scanned = threading.Event()
+
+    def scan(self):
+        """Return {path: (mtime, size)} of the watched files"""
+        files = {}
+        for directory, extension in self.folders.items():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(extension) or entry.name in self.ignore:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[os.path.join(directory, entry.name)] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def check(self):
+        """Rescan now and fire on_change if anything changed"""
+        files = self.scan()
+        if files != self.files:
+            self.files = files
+            try:
+                self.on_change(files)
+            except Exception as e:
+                print(f"Error handling upload change: {e}")
+                traceback.print_exc()
+        self._scanned.set()
+
+    def wait_until_scanned(self, timeout=None):
+        """Block until the first scan has been handled"""
+        return self._scanned.wait(timeout)
+
+    def _run(self):
+        fd = open_inotify(self.folders) if self.use_inotify else None
+        while True:
+            self.check()
+            if fd is None:
+                time.sleep(self.interval)
+                continue
+
+            ready, _, _ = select.select([fd], [], [], self.interval)
+            if ready:
+                # Let a burst of events (e.g. a file being copied in) settle, then drain them
+                time.sleep(0.5)
+                try:
+                    while os.read(fd, 65536):
+                        pass
+                except BlockingIOError:
+                    pass
@@ -0,0 +1,160 @@
+"""
+Versioned cache of serialized endpoint responses.
+
+Keys are (route, normalized query args, data version). Responses to
+routes without query args are kept for as long as they stay current;
+parameterised ones (one per search term, name, ...) share a size-bounded
+LRU. A new data version carries over the responses its changes leave as
+they were.
+Generated export files, which are far larger, go in an ExportCache
+bounded by their total size instead.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+def normalize_args(args):
+    """Sorted (name, value) pairs of a request's query args, dropping empty values"""
+    return tuple(sorted((key, value.strip()) for key, value in args.items(multi=True) if value.strip()))
+
+
+class ResponseCache:
+    """Thread-safe store of serialized responses; a new data version carries over the ones it leaves unchanged"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._fixed = {}
+        self._lru = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        with self._lock:
+            value = self._fixed.get(key)
+            if value is None:
+                value = self._lru.get(key)
+                if value is not None:
+                    self._lru.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store value; key is (route, args, version)"""
+        with self._lock:
+            if not key[1]:
+                self._fixed[key] = value
+                return
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def carry_over(self, version, new_version, keep):
+        """Re-key the responses of version for which keep(route, args) holds to new_version; drop the other versions"""
+        with self._lock:
+            for store in (self._fixed, self._lru):
+                kept = [
+                    ((route, args, new_version), value)
+                    for (route, args, key_version), value in store.items()
+                    if key_version == version and keep(route, args)
+                ]
+                # Responses already cached for new_version are the most recent
+                current = [(key, value) for key, value in store.items() if key[2] == new_version]
+                store.clear()
+                store.update(kept)
+                store.update(current)
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._fixed.clear()
+            self._lru.clear()
+
+
+class ExportCache:
+    """
+    Thread-safe LRU of generated export files (bytes) holding at most
+    max_bytes in total. Concurrent requests for the same missing file
+    wait for one build instead of each building it.
+    """
+
+    def __init__(self, max_bytes=32 * 2**20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._building = {}  # key -> threading.Event set when its build ends
+
+    def get(self, key):
+        """Return the cached bytes for key, or None"""
+        with self._lock:
+            body = self._lru.get(key)
+            if body is not None:
+                self._lru.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        """Store body, evicting the least recently used files to stay within max_bytes"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._lru.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._lru[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._lru.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_or_build(self, key, build):
+        """Return the bytes cached under key, calling build() to make them on a miss"""
+        with self._lock:
+            body = self._lru.get(key)
+            if body is not None:
+                self._lru.move_to_end(key)
+                return body
+            building = self._building.get(key)
+            if building is None:
+                building = self._building[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            building.wait()
+            body = self.get(key)
+            # Build it ourselves if that build failed or the file was not kept
+            return body if body is not None else build()
+
+        try:
+            body = build()
+            self.put(key, body)
+            return body
+        finally:
+            with self._lock:
+                del self._building[key]
+            building.set()
+
+    def carry_over(self, version, new_version, keep):
+        """Re-key the files of version for which keep(route, args) holds to new_version and drop its others"""
+        with self._lock:
+            items = list(self._lru.items())
+            existing = set(self._lru)
+            self._lru.clear()
+            self.size = 0
+            for (route, args, key_version), body in items:
+                key = (route, args, key_version)
+                if key_version == version:
+                    key = (route, args, new_version)
+                    # Files already built for new_version are kept instead
+                    if not keep(route, args) or key in existing:
+                        continue
+                self._lru[key] = body
+                self.size += len(body)
+
+    def clear(self):
+        """Drop every cached file"""
+        with self._lock:
+            self._lru.clear()
+            self.size = 0
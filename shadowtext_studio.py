@@ -1,5 +1,4 @@
 from flask import Blueprint, render_template, request, send_file, jsonify
-from PIL import Image, ImageDraw, ImageFont
 import os
 import math
 
@@ -7,6 +6,9 @@ import math
 shadowtext_bp = Blueprint('shadowtext', __name__)
 
 def generate_image(name, color_top, color_bottom, alpha=10.0, shadow_angle=45, font_size=120):
+    # Pillow is only loaded once an image is actually generated
+    from PIL import Image, ImageDraw, ImageFont
+
     width, height = 800, 1200
 
     # Convert angle from degrees to radians
@@ -137,6 +139,8 @@ def crop():
     if not os.path.exists(path):
         return "No image to crop.", 404
 
+    from PIL import Image
+
     with Image.open(path) as img:
         width, height = img.size
         # Crop square from center, side = width of image
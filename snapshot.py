@@ -0,0 +1,85 @@
+"""
+Immutable view of the loaded timetable.
+
+Everything requests read about the timetable (teacher entries, indexes,
+the sorted teacher list and version info) lives in one TimetableSnapshot.
+Ingest builds a new snapshot off to the side and publishes it by
+rebinding a single module-level reference, so readers take no locks and
+always see one complete version.
+"""
+
+from types import MappingProxyType
+
+from timetable_index import TimetableIndex
+
+
+class TimetableSnapshot:
+    """
+    One published version of the timetable. Attributes cannot be
+    reassigned, and the containers are read-only views or tuples. The
+    entries in them are entries.TimetableEntry objects shared by all
+    teachers of a class and carried over into later snapshots for
+    unchanged teachers; they are not frozen, so readers must never assign
+    to their attributes.
+    """
+
+    __slots__ = (
+        "version",
+        "fingerprint",
+        "records",
+        "records_by_teacher",
+        "timetable_data",
+        "teacher_names",
+        "sorted_teachers",
+        "index",
+        "changes",
+        "source_file",
+        "source_mtime",
+        "modified",
+        "info",
+    )
+
+    def __init__(
+        self,
+        version=0,
+        fingerprint="",
+        records=(),
+        records_by_teacher=None,
+        timetable_data=None,
+        sorted_teachers=(),
+        index=None,
+        changes=None,
+        source_file=None,
+        source_mtime=None,
+        modified=None,
+        info=None,
+    ):
+        timetable_data = timetable_data or {}
+        fields = {
+            "version": version,  # Bumped by every ingest in this process
+            "fingerprint": fingerprint,  # sha256 of the records, the same in every worker
+            "records": tuple(records),
+            "records_by_teacher": MappingProxyType(dict(records_by_teacher or {})),
+            "timetable_data": MappingProxyType(
+                {teacher: tuple(entries) for teacher, entries in timetable_data.items()}
+            ),
+            "teacher_names": frozenset(timetable_data),
+            "sorted_teachers": tuple(sorted_teachers),
+            "index": index or TimetableIndex(timetable_data),
+            "changes": changes,  # {"since", "teachers", "sections", "rooms"} changed by this ingest
+            "source_file": source_file,  # CSV the records were ingested from
+            "source_mtime": source_mtime,  # Its modification time (epoch seconds)
+            "modified": modified,  # Aware datetime the data was first published (Last-Modified)
+            "info": info,  # Timetable title shown on the index page
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TimetableSnapshot is immutable; build a new one with replace()")
+
+    def replace(self, **fields):
+        """Return a copy with the given fields changed"""
+        values = {name: getattr(self, name) for name in self.__slots__ if name != "teacher_names"}
+        values.update(fields)
+        return TimetableSnapshot(**values)
@@ -0,0 +1,262 @@
+"""
+Shared on-disk form of a timetable snapshot.
+
+The ingesting process writes the published timetable to one file that
+every other worker memory-maps read-only, so a new timetable is converted
+and parsed once however many workers serve it. Entries are read from the
+mapping in place, so their data is held once, in the page cache, not
+once per worker. The layout is columnar:
+
+    magic (8 bytes) | header length (uint32) | JSON header | padding to 4
+    | one int32 column per ENTRY_COLUMNS name, `entries` values each
+    | teacher offsets (teachers + 1 int32) | teacher entry ids (int32)
+
+The header holds the version fingerprint, source info and change set,
+the string table and the group/teacher tuple tables that the columns
+index into.
+Integers are in native byte order, as the file never leaves the machine
+that wrote it. Files are replaced atomically, so readers never map a
+partial one.
+"""
+
+from array import array
+from datetime import datetime, timezone
+import json
+import mmap
+import os
+import struct
+
+from entries import EntryFields, clock_sort_key, intern_groups, intern_text, teacher_roster
+
+MAGIC = b"TTSNAP01"
+LENGTH = struct.Struct("=I")
+
+ENTRY_COLUMNS = [
+    "day",
+    "start_time",
+    "end_time",
+    "start_minutes",
+    "end_minutes",
+    "location",
+    "subject",
+    "groups",
+    "teachers",
+]
+
+
+class StringTable:
+    """Assigns ids to strings (or tuples of them) in first-seen order"""
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def id(self, value):
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+
+def write_snapshot_file(path, snapshot, **extra):
+    """
+    Write snapshot (a TimetableSnapshot) to path, replacing any previous
+    file atomically. extra holds further JSON-serializable header fields.
+    """
+    strings = StringTable()
+    group_sets = StringTable()
+    teacher_sets = StringTable()
+    columns = {name: array("i") for name in ENTRY_COLUMNS}
+
+    # Each distinct entry once; teacher timetables refer to them by position
+    positions = {}
+    teacher_offsets = array("i", [0])
+    teacher_entries = array("i")
+    for entries in snapshot.timetable_data.values():
+        for entry in entries:
+            position = positions.get(id(entry))
+            if position is None:
+                position = positions[id(entry)] = len(positions)
+                columns["day"].append(strings.id(entry.day))
+                columns["start_time"].append(strings.id(entry.start_time))
+                columns["end_time"].append(strings.id(entry.end_time))
+                columns["start_minutes"].append(entry.start_minutes)
+                columns["end_minutes"].append(entry.end_minutes)
+                columns["location"].append(strings.id(entry.location))
+                columns["subject"].append(strings.id(entry.subject))
+                columns["groups"].append(
+                    group_sets.id(tuple(strings.id(group) for group in entry.groups))
+                )
+                columns["teachers"].append(
+                    teacher_sets.id(tuple(strings.id(name) for name in entry.teacher_names))
+                )
+            teacher_entries.append(position)
+        teacher_offsets.append(len(teacher_entries))
+
+    # The change set from the previous version, for the readers' caches
+    changes = None
+    if snapshot.changes:
+        changes = {
+            name: value if isinstance(value, str) else sorted(value)
+            for name, value in snapshot.changes.items()
+        }
+
+    header = {
+        "fingerprint": snapshot.fingerprint,
+        "source_file": snapshot.source_file,
+        "source_mtime": snapshot.source_mtime,
+        "modified": snapshot.modified.timestamp() if snapshot.modified else None,
+        "info": snapshot.info,
+        "changes": changes,
+        "teachers": [strings.id(teacher) for teacher in snapshot.timetable_data],
+        "entries": len(positions),
+        "teacher_entries": len(teacher_entries),
+        "strings": strings.values,
+        "group_sets": group_sets.values,
+        "teacher_sets": teacher_sets.values,
+        **extra,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    padding = -(len(MAGIC) + LENGTH.size + len(header_bytes)) % 4
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(LENGTH.pack(len(header_bytes)))
+        file.write(header_bytes)
+        file.write(b"\0" * padding)
+        for name in ENTRY_COLUMNS:
+            columns[name].tofile(file)
+        teacher_offsets.tofile(file)
+        teacher_entries.tofile(file)
+    os.replace(temp_path, path)
+
+
+def read_snapshot_header(path):
+    """Return the JSON header of a snapshot file (fingerprint, source info, tables)"""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a timetable snapshot file")
+        (length,) = LENGTH.unpack(file.read(LENGTH.size))
+        return json.loads(file.read(length))
+
+
+class SnapshotColumns:
+    """
+    The int32 columns of a mapped snapshot file, as memoryviews into the
+    mapping, and the string, group and teacher tables they index into.
+    """
+
+    def __init__(self, mapped, header, start):
+        self._mapped = mapped  # Unmapped once the last entry view is gone
+        count = header["entries"]
+        ints = memoryview(mapped)[start:].cast("i")
+        for index, name in enumerate(ENTRY_COLUMNS):
+            setattr(self, name, ints[index * count : (index + 1) * count])
+        self.ints = ints[len(ENTRY_COLUMNS) * count :]
+
+        self.strings = [intern_text(text) for text in header["strings"]]
+        self.group_sets = [intern_groups(self.strings[i] for i in ids) for ids in header["group_sets"]]
+        self.teacher_sets = [teacher_roster.ids(self.strings[i] for i in ids) for ids in header["teacher_sets"]]
+        self._sort_keys = {}  # (day id, start time id) -> sort key
+
+    def sort_key(self, row):
+        """clock_sort_key of a row, computed once per distinct day and start time"""
+        key = (self.day[row], self.start_time[row])
+        sort_key = self._sort_keys.get(key)
+        if sort_key is None:
+            sort_key = self._sort_keys[key] = clock_sort_key(self.strings[key[0]], self.strings[key[1]])
+        return sort_key
+
+
+class SnapshotEntry(EntryFields):
+    """
+    An entry of a mapped snapshot file. It holds only its row; every field
+    is read from the file's columns on access, so the entries themselves
+    stay in the page cache, shared by all workers mapping the file.
+    """
+
+    __slots__ = ("_columns", "_row")
+
+    def __init__(self, columns, row):
+        self._columns = columns
+        self._row = row
+
+    @property
+    def day(self):
+        return self._columns.strings[self._columns.day[self._row]]
+
+    @property
+    def start_time(self):
+        return self._columns.strings[self._columns.start_time[self._row]]
+
+    @property
+    def end_time(self):
+        return self._columns.strings[self._columns.end_time[self._row]]
+
+    @property
+    def start_minutes(self):
+        return self._columns.start_minutes[self._row]
+
+    @property
+    def end_minutes(self):
+        return self._columns.end_minutes[self._row]
+
+    @property
+    def location(self):
+        return self._columns.strings[self._columns.location[self._row]]
+
+    @property
+    def subject(self):
+        return self._columns.strings[self._columns.subject[self._row]]
+
+    @property
+    def groups(self):
+        return self._columns.group_sets[self._columns.groups[self._row]]
+
+    @property
+    def teacher_ids(self):
+        return self._columns.teacher_sets[self._columns.teachers[self._row]]
+
+    @property
+    def sort_key(self):
+        return self._columns.sort_key(self._row)
+
+
+def read_snapshot_file(path):
+    """
+    Map a snapshot file read-only and return (header, {teacher: [entries]}),
+    with header["modified"] as an aware datetime and the change set's names
+    as sets. The entries are SnapshotEntry views into the mapping; only the
+    header's tables and the teacher lists are built in this process.
+    """
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[: len(MAGIC)] != MAGIC:
+        mapped.close()
+        raise ValueError(f"{path} is not a timetable snapshot file")
+    (length,) = LENGTH.unpack_from(mapped, len(MAGIC))
+    start = len(MAGIC) + LENGTH.size
+    header = json.loads(mapped[start : start + length])
+    start += length
+    start += -start % 4
+
+    columns = SnapshotColumns(mapped, header, start)
+    entries = [SnapshotEntry(columns, row) for row in range(header["entries"])]
+    teachers = header["teachers"]
+    teacher_offsets = columns.ints[: len(teachers) + 1]
+    entry_ids = columns.ints[len(teachers) + 1 :]
+    timetable_data = {
+        columns.strings[teacher]: [entries[i] for i in entry_ids[teacher_offsets[t] : teacher_offsets[t + 1]]]
+        for t, teacher in enumerate(teachers)
+    }
+
+    if header["modified"] is not None:
+        header["modified"] = datetime.fromtimestamp(header["modified"], timezone.utc)
+    if header.get("changes"):
+        header["changes"] = {
+            name: value if isinstance(value, str) else set(value)
+            for name, value in header["changes"].items()
+        }
+    return header, timetable_data
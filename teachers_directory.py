@@ -0,0 +1,120 @@
+"""
+In-memory teachers directory behind /get_teachers.
+
+teachers-record.csv is parsed once per version of the file. Searchable
+fields are lowercased up front, the order for every sort option is
+precomputed, and trigram indexes narrow the search, subject and section
+filters to the teachers that can match before the substring test.
+Serialized responses are cached per query for the life of the directory.
+"""
+
+from collections import OrderedDict
+import csv
+import os
+import threading
+
+from timetable_index import TrigramIndex
+
+# Response field -> teachers-record.csv column
+RECORD_COLUMNS = {
+    "name": "Teacher name",
+    "subjects": "Subjects/Courses",
+    "sections": "Sections",
+    "office_number": "Office Number",
+    "superior_email": "Superior email",
+    "image": "Teacher's Image",
+    "designation": "Teacher's Designation",
+    "employee_code": "Teacher's Employee code",
+}
+
+# Fields the free-text search looks in
+SEARCH_FIELDS = ["name", "subjects", "sections", "designation", "employee_code", "office_number"]
+
+# sort= option -> sort key
+SORT_KEYS = {
+    "name": lambda teacher: teacher["name"].lower(),
+    "designation": lambda teacher: (teacher["designation"] or "").lower(),
+    "subjects": lambda teacher: teacher["subjects"].lower(),
+    "sections": lambda teacher: teacher["sections"].lower(),
+    "employee_code": lambda teacher: teacher["employee_code"] or "",
+    "office_number": lambda teacher: teacher["office_number"] or "",
+}
+
+
+def read_teachers_record(path):
+    """Teachers from teachers-record.csv in file order, as response dicts"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return [
+            {field: row.get(column, "") for field, column in RECORD_COLUMNS.items()}
+            for row in csv.DictReader(file)
+        ]
+
+
+class TeachersDirectory:
+    """Indexed, pre-sorted teacher records for one version of teachers-record.csv"""
+
+    def __init__(self, teachers, version=None, max_cached_queries=256):
+        self.teachers = teachers
+        self.version = version
+        self.max_cached_queries = max_cached_queries
+
+        self.search_index = TrigramIndex(
+            [teacher[field].lower() for field in SEARCH_FIELDS] for teacher in teachers
+        )
+        # Subject and section filters are case-sensitive
+        self.subject_index = TrigramIndex([teacher["subjects"]] for teacher in teachers)
+        self.section_index = TrigramIndex([teacher["sections"]] for teacher in teachers)
+
+        # Sorting is stable, so ties keep file order
+        self.orders = {}
+        self.ranks = {}
+        for sort_by, key in SORT_KEYS.items():
+            order = sorted(range(len(teachers)), key=lambda i: key(teachers[i]))
+            self.orders[sort_by] = order
+            ranks = [0] * len(teachers)
+            for rank, teacher_id in enumerate(order):
+                ranks[teacher_id] = rank
+            self.ranks[sort_by] = ranks
+
+        self._lock = threading.Lock()
+        self._serialized = OrderedDict()
+
+    @classmethod
+    def load(cls, path, version=None):
+        return cls(read_teachers_record(path), version)
+
+    def query(self, search="", subject="", section="", sort_by="name"):
+        """Teachers matching every given filter, in sort_by order (file order for unknown options)"""
+        matches = None
+        for index, text in (
+            (self.search_index, search.lower()),
+            (self.subject_index, subject),
+            (self.section_index, section),
+        ):
+            if text:
+                found = set(index.search(text))
+                matches = found if matches is None else matches & found
+
+        if matches is None:
+            order = self.orders.get(sort_by, range(len(self.teachers)))
+        elif sort_by in self.ranks:
+            order = sorted(matches, key=self.ranks[sort_by].__getitem__)
+        else:
+            order = sorted(matches)
+        return [dict(self.teachers[i]) for i in order]
+
+    def cached(self, key, build):
+        """Return the serialization cached under key, building it on a miss"""
+        with self._lock:
+            if key in self._serialized:
+                self._serialized.move_to_end(key)
+                return self._serialized[key]
+
+        value = build()
+        with self._lock:
+            self._serialized[key] = value
+            while len(self._serialized) > self.max_cached_queries:
+                self._serialized.popitem(last=False)
+        return value
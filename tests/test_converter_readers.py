@@ -0,0 +1,59 @@
+"""
+Parity of the converter's two workbook readers.
+
+The streaming reader (xlsx_stream) must give the converter exactly what
+openpyxl does, on every workbook in uploads/xlsx.
+"""
+
+import glob
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import converter  # noqa: E402
+
+WORKBOOKS = sorted(glob.glob(os.path.join(ROOT, "uploads", "xlsx", "*.xlsx")))
+
+pytestmark = pytest.mark.skipif(not WORKBOOKS, reason="no sample workbooks in uploads/xlsx")
+
+
+def grid_cells(grid, max_row, max_col):
+    """Every cell's value and merged range over the given extent"""
+    return [
+        [(grid.value(row, col), grid.merged_range(row, col)) for col in range(1, max_col + 1)]
+        for row in range(1, max_row + 1)
+    ]
+
+
+@pytest.mark.parametrize("workbook", WORKBOOKS, ids=os.path.basename)
+def test_sheet_grids_match(workbook):
+    openpyxl_grids = converter.load_sheet_grids(workbook, reader="openpyxl")
+    stream_grids = converter.load_sheet_grids(workbook, reader="stream")
+
+    assert [grid.title for grid in stream_grids] == [grid.title for grid in openpyxl_grids]
+    for expected, actual in zip(openpyxl_grids, stream_grids):
+        assert actual.merged_count == expected.merged_count
+        max_row = max(expected.max_row, actual.max_row)
+        max_col = max(expected.max_col, actual.max_col)
+        assert grid_cells(actual, max_row, max_col) == grid_cells(expected, max_row, max_col)
+
+
+@pytest.mark.parametrize("workbook", WORKBOOKS, ids=os.path.basename)
+def test_extracted_rows_match(workbook):
+    expected = converter.extract_timetable_rows(workbook, reader="openpyxl")
+    actual = converter.extract_timetable_rows(workbook, reader="stream")
+
+    assert actual == expected
+    assert expected
+
+
+@pytest.mark.parametrize("workbook", WORKBOOKS, ids=os.path.basename)
+def test_parallel_sheet_reading_matches_serial(workbook):
+    expected = converter.extract_timetable_rows(workbook, reader="stream", workers=1)
+    actual = converter.extract_timetable_rows(workbook, reader="stream", workers=2)
+
+    assert actual == expected
@@ -0,0 +1,59 @@
+"""
+Teacher entries built by ingest.
+
+Consecutive slots of a class are merged the same way for every teacher
+of it, whatever else each teacher teaches in between.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("TIMETABLE_WARM_START", "0")
+
+import app  # noqa: E402
+import converter  # noqa: E402
+from timetable_index import TimetableIndex  # noqa: E402
+
+
+def row(time, room, subject, teachers):
+    return {
+        "Day": "Monday",
+        "Time": time,
+        "Room": room,
+        "Subject": subject,
+        "Class/Group": "BSSE-1A",
+        "Teacher(s) Name": teachers,
+    }
+
+
+def build_timetable(rows):
+    records = converter.rows_to_records(rows)
+    shared_entries = {}
+    return {
+        teacher: app.build_teacher_entries(teacher, teacher_records, shared_entries)
+        for teacher, teacher_records in app.group_records_by_teacher(records).items()
+    }
+
+
+def slots(entries, subject):
+    return [(entry.start_time, entry.end_time) for entry in entries if entry.subject == subject]
+
+
+def test_co_taught_slots_merge_alike_for_every_teacher():
+    # Alpha also teaches ASubj at 9:20, which sorts between the two XSubj slots
+    timetable = build_timetable(
+        [
+            row("8:00-9:20", "Room1", "XSubj", "Mr. Alpha Mr. Beta"),
+            row("9:20-10:40", "Room1", "XSubj", "Mr. Alpha Mr. Beta"),
+            row("9:20-10:40", "Room2", "ASubj", "Mr. Alpha"),
+        ]
+    )
+
+    assert slots(timetable["MR. ALPHA"], "XSubj") == [("8:00", "10:40")]
+    assert slots(timetable["MR. BETA"], "XSubj") == [("8:00", "10:40")]
+    assert slots(timetable["MR. ALPHA"], "ASubj") == [("9:20", "10:40")]
+
+    rooms = TimetableIndex(timetable).find_rooms("Room1")
+    assert [(entry.start_time, entry.end_time) for entry in rooms] == [("8:00", "10:40")]
@@ -0,0 +1,241 @@
+"""
+Secondary indexes over the ingested teacher timetables.
+
+Teacher timetables list a co-taught entry once per teacher. The index
+keeps each distinct entry once per room, section and day, in the order
+/timetable returns entries (day, then start time), so room, section and
+day queries are lookups instead of scans over every teacher. Re-ingest
+only re-ranks the entries of the teachers that changed. Room and
+section names are indexed by trigram, so a substring query only tests
+the names that can contain it.
+"""
+
+from bisect import bisect_left
+from heapq import merge
+from operator import itemgetter
+
+from entries import clock_sort_key
+
+
+def day_time_key(entry):
+    """Sort key for entries: day order, then start time"""
+    return entry.sort_key
+
+
+def room_keys(entry):
+    """Rooms an entry is indexed under"""
+    location = entry.location.strip()
+    return (location,) if location else ()
+
+
+def section_keys(entry):
+    """Sections an entry is indexed under"""
+    return dict.fromkeys(entry.groups)
+
+
+def day_keys(entry):
+    """Days an entry is indexed under"""
+    return (entry.day,)
+
+
+def on_day(pairs, day):
+    """
+    The (rank, entry) pairs of a rank-sorted list that are on day. Ranks
+    start with the day's sort key, so they are one run found by bisection.
+    """
+    start = clock_sort_key(day, "")
+    low = bisect_left(pairs, start, key=lambda pair: pair[0][0])
+    high = bisect_left(pairs, start + 10**9, key=lambda pair: pair[0][0])
+    return [pair for pair in pairs[low:high] if pair[1].day == day]
+
+
+class TrigramIndex:
+    """
+    Substring lookup over short texts: trigram postings narrow the
+    candidates, a substring test confirms them. Matching is case-sensitive;
+    fold the texts and the query beforehand for case-insensitive lookups.
+    """
+
+    def __init__(self, documents):
+        self.documents = [tuple(texts) for texts in documents]
+        self.postings = {}
+        for doc_id, texts in enumerate(self.documents):
+            for text in texts:
+                for i in range(len(text) - 2):
+                    self.postings.setdefault(text[i : i + 3], set()).add(doc_id)
+
+    def search(self, query):
+        """Ids of the documents with a text containing query, in id order"""
+        if len(query) < 3:
+            candidates = range(len(self.documents))
+        else:
+            postings = []
+            for i in range(len(query) - 2):
+                posting = self.postings.get(query[i : i + 3])
+                if not posting:
+                    return []
+                postings.append(posting)
+            candidates = sorted(set.intersection(*postings))
+        return [
+            doc_id
+            for doc_id in candidates
+            if any(query in text for text in self.documents[doc_id])
+        ]
+
+
+class SubstringIndex:
+    """Case-insensitive substring lookup over a set of names"""
+
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self.trigrams = TrigramIndex([name.lower()] for name in self.names)
+
+    def search(self, query):
+        """Return the names containing query, ignoring case"""
+        return [self.names[i] for i in self.trigrams.search(query.lower())]
+
+
+class TimetableIndex:
+    """
+    Deduplicated, pre-sorted entries by room, section and day.
+
+    Each room, section and day maps to (rank, entry) pairs sorted by rank:
+    day and start time, then the position of the entry's first teacher in
+    teacher_keys order (the order of timetable_data when not given) and
+    its place in that teacher's timetable. Given the index of the previous
+    version (built with teacher_keys too) and the ingest's change set,
+    only the entries of the changed teachers are re-ranked and merged into
+    the lists; the other entries keep their ranks, which do not depend on
+    the changed teachers.
+    """
+
+    def __init__(self, timetable_data, teacher_keys=None, previous=None, changes=None):
+        self.timetable_data = timetable_data
+        self.keyed = teacher_keys is not None
+        self.teacher_keys = teacher_keys if self.keyed else {teacher: i for i, teacher in enumerate(timetable_data)}
+        self._positions = {}  # teacher -> {entry identity: position}, filled on demand
+        self._entries = None
+
+        if previous is not None and previous.keyed and self.keyed and changes is not None:
+            # Entries the changed teachers had or have
+            touched = [
+                entry
+                for teacher in changes["teachers"]
+                for entries in (previous.timetable_data.get(teacher, ()), timetable_data.get(teacher, ()))
+                for entry in entries
+            ]
+            touched_ids = {entry.identity() for entry in touched}
+            self.by_room = self._update(previous.by_room, room_keys, touched, touched_ids)
+            self.by_section = self._update(previous.by_section, section_keys, touched, touched_ids)
+            self.by_day = self._update(previous.by_day, day_keys, touched, touched_ids)
+        else:
+            self.by_room = {}
+            self.by_section = {}
+            self.by_day = {}
+            self._entries = []
+            for rank, entry in self._ranked_entries():
+                self._entries.append(entry)
+                for room in room_keys(entry):
+                    self.by_room.setdefault(room, []).append((rank, entry))
+                for group in section_keys(entry):
+                    self.by_section.setdefault(group, []).append((rank, entry))
+                self.by_day.setdefault(entry.day, []).append((rank, entry))
+            previous = None
+
+        # Name lookups only change when a room or section comes or goes
+        if previous is not None and self.by_room.keys() == previous.by_room.keys():
+            self.rooms = previous.rooms
+        else:
+            self.rooms = SubstringIndex(self.by_room)
+        if previous is not None and self.by_section.keys() == previous.by_section.keys():
+            self.sections = previous.sections
+        else:
+            self.sections = SubstringIndex(self.by_section)
+
+    def _ranked_entries(self):
+        """(rank, entry) of every distinct entry, in rank order"""
+        ranked = sorted(
+            ((entry.sort_key, self.teacher_keys[teacher], position), entry)
+            for teacher, entries in self.timetable_data.items()
+            for position, entry in enumerate(entries)
+        )
+        seen = set()
+        for rank, entry in ranked:
+            identity = entry.identity()
+            if identity not in seen:
+                seen.add(identity)
+                yield rank, entry
+
+    def _rank(self, entry):
+        """(rank, entry) of entry as held by its first teacher, or None if no teacher holds it"""
+        identity = entry.identity()
+        found = None
+        for teacher in entry.teacher_names:
+            entries = self.timetable_data.get(teacher)
+            if entries is None:
+                continue
+            positions = self._positions.get(teacher)
+            if positions is None:
+                positions = self._positions[teacher] = {}
+                for position, held in enumerate(entries):
+                    positions.setdefault(held.identity(), position)
+            position = positions.get(identity)
+            if position is not None:
+                rank = (entry.sort_key, self.teacher_keys[teacher], position)
+                if found is None or rank < found[0]:
+                    found = (rank, entries[position])
+        return found
+
+    def _update(self, previous_lists, keys_of, touched, touched_ids):
+        """
+        previous_lists with the touched entries (those with an identity in
+        touched_ids) ranked again and merged into the lists of their names
+        """
+        lists = dict(previous_lists)
+        touched_by_name = {}
+        for entry in touched:
+            for name in keys_of(entry):
+                touched_by_name.setdefault(name, {}).setdefault(entry.identity(), entry)
+
+        for name, entries in touched_by_name.items():
+            kept = [pair for pair in previous_lists.get(name, ()) if pair[1].identity() not in touched_ids]
+            ranked = sorted((pair for pair in map(self._rank, entries.values()) if pair is not None), key=itemgetter(0))
+            pairs = list(merge(kept, ranked, key=itemgetter(0)))
+            if pairs:
+                lists[name] = pairs
+            else:
+                lists.pop(name, None)
+        return lists
+
+    @property
+    def entries(self):
+        """Every distinct entry in rank order, merged from the day lists on first use after an incremental update"""
+        if self._entries is None:
+            self._entries = [entry for _, entry in merge(*self.by_day.values(), key=itemgetter(0))]
+        return self._entries
+
+    def find_day(self, day):
+        """Entries on day"""
+        return [entry for _, entry in self.by_day.get(day, ())]
+
+    def _collect(self, index, names, day=None):
+        """Entries listed under any of names (and on day, if given), in sorted order"""
+        lists = [index[name] for name in names]
+        if day:
+            lists = [on_day(pairs, day) for pairs in lists]
+        if len(lists) == 1:
+            pairs = lists[0]
+        else:
+            # An entry listed under several names has the same rank in each
+            pairs = sorted({rank: entry for pairs in lists for rank, entry in pairs}.items(), key=itemgetter(0))
+        return [entry for _, entry in pairs]
+
+    def find_rooms(self, name, day=None):
+        """Entries in rooms whose name contains name"""
+        rooms = self.rooms.search(name)
+        return self._collect(self.by_room, rooms, day) if rooms else []
+
+    def find_sections(self, name, day=None):
+        """Entries for sections whose name contains name"""
+        sections = self.sections.search(name)
+        return self._collect(self.by_section, sections, day) if sections else []
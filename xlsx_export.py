@@ -0,0 +1,143 @@
+"""
+Streaming XLSX exports.
+
+Workbooks are written with openpyxl's write-only mode: rows go from the
+snapshot straight into the sheet XML, without a DataFrame or an in-memory
+worksheet in between. Every sheet gets a bold, shaded header row that
+stays frozen while scrolling, an auto filter and column widths fitted to
+the first rows of data.
+"""
+
+from io import BytesIO
+from itertools import chain, islice
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Column widths are fitted to the header and this many leading rows
+WIDTH_SAMPLE_ROWS = 200
+MIN_COLUMN_WIDTH = 8
+MAX_COLUMN_WIDTH = 60
+
+# Excel's limits on sheet titles
+MAX_SHEET_TITLE = 31
+INVALID_TITLE_CHARS = str.maketrans({char: " " for char in "[]:*?/\\"})
+
+
+def cell_value(value):
+    """A value as written to a cell; lists and other containers become their text, as pandas wrote them"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def column_letter(index):
+    """Excel column letter(s) of a 0-based column index"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def record_columns(records):
+    """Keys of a list of dicts in first-seen order, as DataFrame(records) orders them"""
+    columns = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+
+class XlsxWorkbook:
+    """
+    A write-only workbook built sheet by sheet:
+
+        workbook = XlsxWorkbook()
+        workbook.add_sheet("Rooms", ["Room"], [[room] for room in rooms])
+        body = workbook.to_bytes()
+    """
+
+    def __init__(self):
+        # Imported here so the JSON API never loads openpyxl
+        from openpyxl import Workbook
+        from openpyxl.styles import Border, Font, PatternFill, Side
+
+        self._workbook = Workbook(write_only=True)
+        self._titles = set()
+        self._header_font = Font(bold=True)
+        self._header_fill = PatternFill("solid", start_color="D9E1F2")
+        self._header_border = Border(bottom=Side(style="thin"))
+
+    def sheet_title(self, title):
+        """A valid sheet title for title, unique within this workbook"""
+        base = str(title).translate(INVALID_TITLE_CHARS).strip() or "Sheet"
+        base = base[:MAX_SHEET_TITLE]
+        candidate, number = base, 1
+        while candidate.lower() in self._titles:
+            number += 1
+            suffix = f" ({number})"
+            candidate = base[: MAX_SHEET_TITLE - len(suffix)] + suffix
+        self._titles.add(candidate.lower())
+        return candidate
+
+    def add_sheet(self, title, columns, rows):
+        """
+        Append a sheet with a header row of columns and then rows (an
+        iterable of value sequences, consumed lazily). An empty columns list
+        gives an empty sheet.
+        """
+        from openpyxl.cell import WriteOnlyCell
+
+        worksheet = self._workbook.create_sheet(self.sheet_title(title))
+        if not columns:
+            return worksheet
+
+        rows = iter(rows)
+        sample = [[cell_value(value) for value in row] for row in islice(rows, WIDTH_SAMPLE_ROWS)]
+
+        # Widths and panes must be set before the first row is written
+        for index, column in enumerate(columns):
+            longest = max(
+                (len(str(row[index])) for row in sample if index < len(row) and row[index] is not None),
+                default=0,
+            )
+            width = min(max(len(str(column)), longest, MIN_COLUMN_WIDTH) + 2, MAX_COLUMN_WIDTH)
+            worksheet.column_dimensions[column_letter(index)].width = width
+        worksheet.freeze_panes = "A2"
+
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(worksheet, value=cell_value(column))
+            cell.font = self._header_font
+            cell.fill = self._header_fill
+            cell.border = self._header_border
+            header.append(cell)
+        worksheet.append(header)
+
+        row_count = 0
+        for row in chain(sample, rows):
+            worksheet.append([cell_value(value) for value in row])
+            row_count += 1
+        worksheet.auto_filter.ref = f"A1:{column_letter(len(columns) - 1)}{row_count + 1}"
+        return worksheet
+
+    def add_records(self, title, records, columns=None):
+        """Append a sheet of dicts; columns default to their keys in first-seen order"""
+        if columns is None:
+            columns = record_columns(records)
+        return self.add_sheet(title, columns, ([record.get(column) for column in columns] for record in records))
+
+    def to_bytes(self):
+        """The finished workbook; a workbook without sheets gets one empty sheet"""
+        if not self._titles:
+            self.add_sheet("Sheet", [], [])
+        output = BytesIO()
+        self._workbook.save(output)
+        return output.getvalue()
+
+
+def records_to_xlsx(records, title="Data", columns=None):
+    """XLSX bytes of a single sheet of dicts"""
+    workbook = XlsxWorkbook()
+    workbook.add_records(title, records, columns)
+    return workbook.to_bytes()
@@ -0,0 +1,223 @@
+"""
+Streaming .xlsx reader for the timetable converter.
+
+Reads cell values, shared strings and merged ranges straight out of the
+workbook archive with iterparse, skipping everything openpyxl's full
+load_workbook materializes (cell objects, fonts, fills, borders, ...).
+Values are typed the way openpyxl types them so both readers feed the
+same day-block detection and extraction logic.
+"""
+
+from xml.etree.ElementTree import iterparse
+import posixpath
+import zipfile
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+WORKSHEET_TYPE = REL_NS + "/worksheet"
+
+
+def _local(tag):
+    """Strip the namespace from an element tag"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _cast_number(value):
+    """Convert a numeric cell string to int or float, as openpyxl does"""
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _read_workbook(archive):
+    """Return (sheets, epoch) where sheets is [(title, archive path)] in workbook order"""
+    with archive.open("xl/_rels/workbook.xml.rels") as rels_file:
+        targets = {}
+        for _, node in iterparse(rels_file):
+            if _local(node.tag) == "Relationship" and node.get("Type") == WORKSHEET_TYPE:
+                target = node.get("Target")
+                if target.startswith("/"):
+                    target = target.lstrip("/")
+                else:
+                    target = posixpath.normpath(posixpath.join("xl", target))
+                targets[node.get("Id")] = target
+
+    sheets = []
+    epoch = CALENDAR_WINDOWS_1900
+    with archive.open("xl/workbook.xml") as workbook_file:
+        for _, node in iterparse(workbook_file):
+            tag = _local(node.tag)
+            if tag == "workbookPr" and node.get("date1904") in ("1", "true"):
+                epoch = CALENDAR_MAC_1904
+            elif tag == "sheet":
+                rel_id = node.get(f"{{{REL_NS}}}id")
+                if rel_id in targets:  # Chartsheets are not worksheets
+                    sheets.append((node.get("name"), targets[rel_id]))
+    return sheets, epoch
+
+
+def _read_shared_strings(archive):
+    """Return the shared string table as a list"""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as strings_file:
+        for _, node in iterparse(strings_file):
+            if _local(node.tag) != "si":
+                continue
+            # Plain <t> or rich-text runs <r><t>; phonetic runs <rPh> are not content
+            parts = []
+            for child in node:
+                tag = _local(child.tag)
+                if tag == "t":
+                    parts.append(child.text or "")
+                elif tag == "r":
+                    parts.extend(t.text or "" for t in child if _local(t.tag) == "t")
+            strings.append("".join(parts))
+            node.clear()
+    return strings
+
+
+def _read_style_kinds(archive):
+    """Return, per cellXfs index, 'date', 'timedelta' or None"""
+    if "xl/styles.xml" not in archive.namelist():
+        return []
+
+    custom_formats = {}
+    kinds = []
+    with archive.open("xl/styles.xml") as styles_file:
+        in_cell_xfs = False
+        for event, node in iterparse(styles_file, events=("start", "end")):
+            tag = _local(node.tag)
+            if tag == "cellXfs":
+                in_cell_xfs = event == "start"
+            elif event == "end" and tag == "numFmt":
+                custom_formats[int(node.get("numFmtId"))] = node.get("formatCode")
+            elif event == "end" and tag == "xf" and in_cell_xfs:
+                fmt_id = int(node.get("numFmtId", 0))
+                fmt = custom_formats.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+                if fmt and is_timedelta_format(fmt):
+                    kinds.append("timedelta")
+                elif fmt and is_date_format(fmt):
+                    kinds.append("date")
+                else:
+                    kinds.append(None)
+    return kinds
+
+
+def _read_sheet(archive, path, shared_strings, style_kinds, epoch):
+    """Stream one worksheet part; return (rows, merged_ranges)"""
+    cells = {}
+    merged_ranges = []
+    max_row = 0
+    max_col = 0
+    row_index = 0
+    col_index = 0
+
+    with archive.open(path) as sheet_file:
+        for event, node in iterparse(sheet_file, events=("start", "end")):
+            tag = _local(node.tag)
+
+            if event == "start":
+                if tag == "row":
+                    row_index = int(node.get("r", row_index + 1))
+                    col_index = 0
+                continue
+
+            if tag == "c":
+                ref = node.get("r")
+                if ref:
+                    column, row_index = coordinate_from_string(ref)
+                    col_index = column_index_from_string(column)
+                else:
+                    col_index += 1
+                max_row = max(max_row, row_index)
+                max_col = max(max_col, col_index)
+
+                data_type = node.get("t", "n")
+                value = None
+                formula = None
+                for child in node:
+                    child_tag = _local(child.tag)
+                    if child_tag == "v":
+                        value = child.text
+                    elif child_tag == "f":
+                        formula = child.text
+                    elif child_tag == "is":
+                        value = "".join(t.text or "" for t in child.iter() if _local(t.tag) == "t")
+
+                if formula:
+                    # openpyxl (data_only=False) reports the formula, not its cached result
+                    value = "=" + formula
+                elif value is not None:
+                    if data_type == "s":
+                        value = shared_strings[int(value)]
+                    elif data_type == "b":
+                        value = bool(int(value))
+                    elif data_type == "d":
+                        value = from_ISO8601(value)
+                    elif data_type == "n":
+                        value = _cast_number(value)
+                        style_id = int(node.get("s", 0))
+                        kind = style_kinds[style_id] if style_id < len(style_kinds) else None
+                        if kind:
+                            value = from_excel(value, epoch, timedelta=kind == "timedelta")
+
+                if value is not None:
+                    cells[(row_index, col_index)] = value
+                node.clear()
+
+            elif tag == "mergeCell":
+                min_col, min_row, max_col_, max_row_ = range_boundaries(node.get("ref"))
+                merged_ranges.append((min_row, min_col, max_row_, max_col_))
+
+            elif tag == "row":
+                node.clear()
+
+    rows = [[None] * max_col for _ in range(max_row)]
+    for (r, c), value in cells.items():
+        rows[r - 1][c - 1] = value
+    return rows, merged_ranges
+
+
+def iter_sheets(filename):
+    """
+    Stream the worksheets of an .xlsx file in workbook order.
+
+    Yields (title, rows, merged_ranges) per worksheet, where rows is a list
+    of 1-based-row value lists and merged_ranges holds
+    (min_row, min_col, max_row, max_col) tuples.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        sheets, epoch = _read_workbook(archive)
+        shared_strings = _read_shared_strings(archive)
+        style_kinds = _read_style_kinds(archive)
+        for title, path in sheets:
+            rows, merged_ranges = _read_sheet(archive, path, shared_strings, style_kinds, epoch)
+            yield title, rows, merged_ranges
+
+
+def sheet_count(filename):
+    """Number of worksheets in an .xlsx file"""
+    with zipfile.ZipFile(filename) as archive:
+        sheets, _ = _read_workbook(archive)
+    return len(sheets)
+
+
+def read_sheet(filename, index):
+    """
+    Read only the index-th (0-based) worksheet of an .xlsx file; returns
+    (title, rows, merged_ranges) as iter_sheets yields them. Lets several
+    processes each parse a different sheet of the same workbook.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        sheets, epoch = _read_workbook(archive)
+        title, path = sheets[index]
+        rows, merged_ranges = _read_sheet(
+            archive, path, _read_shared_strings(archive), _read_style_kinds(archive), epoch
+        )
+    return title, rows, merged_ranges